@@ -2,11 +2,64 @@ from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
-    mongodb_uri: str = "mongodb://localhost:27017"
+    mongodb_uri: str = "mongodb://localhost:27017"  # MongoDB 5.0+ (insights pipeline)
     db_name: str = "mycare"
+    db_ensure_indexes: bool = True
+    db_verify_query_plans: bool = False
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: int = 0  # 0 = driver default
+    mongo_wait_queue_timeout_ms: int = 0
+    mongo_server_selection_timeout_ms: int = 5000
+    mongo_connect_timeout_ms: int = 10000
+    mongo_socket_timeout_ms: int = 0
+    mongo_compressors: str = ""  # e.g. "zstd,snappy"; needs zstandard / python-snappy
+    mongo_read_preference: str = "primary"
+    mongo_write_concern: str = ""  # e.g. "majority" or "1"
+    mongo_monitoring_enabled: bool = True
+    metrics_enabled: bool = False
+    # Bearer token for /system/stats and /metrics; empty = both return 404
+    ops_token: str = ""
     jwt_secret: str = "mycare_super_secret_key"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 10080  # 7 days
+    # Claims mode: short-lived access tokens carrying (user id, token version)
+    # plus a single-use refresh token.
+    claims_tokens_enabled: bool = False
+    claims_access_token_expire_minutes: int = 15
+    refresh_token_expire_minutes: int = 43200  # 30 days
+    prediction_cache_size: int = 10000
+    prediction_cache_ttl_seconds: int = 86400
+    prediction_offload_threshold: int = 50  # cycles
+    import_batch_size: int = 1000  # rows per bulk_write
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 60
+    token_cache_enabled: bool = True
+    token_cache_size: int = 10000
+    rate_limit_enabled: bool = False
+    rate_limit_login_per_minute: int = 10  # per client address
+    rate_limit_login_burst: int = 10
+    rate_limit_reads_per_minute: int = 120  # per user, heavy reads
+    rate_limit_reads_burst: int = 30
+    password_hash_executor: str = "thread"  # thread/process
+    password_hash_workers: int = 4
+    password_hash_concurrency: int = 4
+    # Safe to enable in every worker: a MongoDB lease elects one runner
+    reminder_scheduler_enabled: bool = False
+    reminder_tick_seconds: int = 30
+    reminder_horizon_seconds: int = 900
+    reminder_grace_seconds: int = 300  # older occurrences are skipped, not sent
+    # Cross-worker cache invalidation; needs a replica set
+    change_watcher_enabled: bool = False
+    # Production server (serve.py)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = one per CPU
+    server_max_requests: int = 0  # recycle a worker after this many; 0 = never
+    server_max_requests_jitter: int = 0
+    server_graceful_timeout_seconds: int = 30
+    server_forwarded_allow_ips: str = "127.0.0.1"
+    server_access_log: bool = False
 
     class Config:
         env_file = ".env"
@@ -1,15 +1,55 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from config import settings
+from services.db_monitoring import CommandMetricsListener, PoolMetricsListener
+from services.index_service import ensure_indexes, verify_query_plans
+from services.insights_service import MIN_SERVER_VERSION
 
 client: AsyncIOMotorClient = None
 db = None
+server_version = None  # (major, minor), known after connect_db
+
+
+def client_options() -> dict:
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "readPreference": settings.mongo_read_preference,
+    }
+    if settings.mongo_max_idle_time_ms:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_wait_queue_timeout_ms:
+        options["waitQueueTimeoutMS"] = settings.mongo_wait_queue_timeout_ms
+    if settings.mongo_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    if settings.mongo_write_concern:
+        w = settings.mongo_write_concern
+        options["w"] = int(w) if w.isdigit() else w
+    if settings.mongo_monitoring_enabled:
+        options["event_listeners"] = [CommandMetricsListener(), PoolMetricsListener()]
+    return options
 
 
 async def connect_db():
-    global client, db
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    global client, db, server_version
+    client = AsyncIOMotorClient(settings.mongodb_uri, **client_options())
     db = client[settings.db_name]
-    print(f"Connected to MongoDB: {settings.db_name}")
+    # Fail startup early if the server is unreachable
+    await client.admin.command("ping")
+    server_version = tuple((await client.server_info())["versionArray"][:2])
+    print(f"Connected to MongoDB {'.'.join(map(str, server_version))}: {settings.db_name}")
+    if server_version < MIN_SERVER_VERSION:
+        print(f"MongoDB {'.'.join(map(str, MIN_SERVER_VERSION))}+ is required for /insights; it will return 501")
+    if settings.db_ensure_indexes:
+        conflicts = await ensure_indexes(db)
+        if conflicts:
+            print(f"Unique indexes not built (run scripts.dedupe_unique_keys): {', '.join(conflicts)}")
+    if settings.db_verify_query_plans:
+        await verify_query_plans(db)
+        print("Query plans verified: no collection scans")
 
 
 async def close_db():
@@ -21,3 +61,7 @@ async def close_db():
 
 def get_db():
     return db
+
+
+def get_server_version():
+    return server_version
@@ -1,35 +1,173 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import hmac
+import math
+import time
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError
 from database import get_db
 from bson import ObjectId
-from services.auth_service import decode_access_token
+from config import settings
+from services.auth_service import REFRESH_TOKEN, decode_access_token
+from services.cache_service import user_cache, token_cache
+from services.metrics_service import span
+from services.rate_limit import TokenBucketLimit
 
 security = HTTPBearer()
+ops_security = HTTPBearer(auto_error=False)
 
+login_limit = TokenBucketLimit(
+    "login", settings.rate_limit_login_per_minute, settings.rate_limit_login_burst
+)
+read_limit = TokenBucketLimit(
+    "reads", settings.rate_limit_reads_per_minute, settings.rate_limit_reads_burst
+)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-):
-    token = credentials.credentials
-    payload = decode_access_token(token)
+
+async def _decode_token(token: str):
+    if not settings.token_cache_enabled:
+        with span("decode_access_token"):
+            return decode_access_token(token)
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = await token_cache.get(key)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return payload
+    with span("decode_access_token"):
+        payload = decode_access_token(token)
+    if payload:
+        await token_cache.set(key, payload)
+    return payload
+
+
+async def _token_claims(token: str) -> dict:
+    payload = await _decode_token(token)
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub") or payload.get("typ") == REFRESH_TOKEN:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
+    return payload
+
+
+async def _load_current_user(payload: dict):
+    user_id = payload["sub"]
+    user = await user_cache.get(user_id)
+    if user is None:
+        db = get_db()
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"password_hash": 0})
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        await user_cache.set(user_id, user)
+    # Tokens issued before versioning count as version 0, so they die with
+    # the user's first revocation
+    if payload.get("ver", 0) != user.get("token_version", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
+    return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    with span("get_current_user"):
+        payload = await _token_claims(credentials.credentials)
+        return await _load_current_user(payload)
+
+
+# Write-version counters on the user document (ETags, prediction stamps)
+VERSION_FIELDS = {
+    "cycles_version": 1,
+    "symptoms_version": 1,
+    "profile_version": 1,
+    "reminders_version": 1,
+    "token_version": 1,
+}
+
+
+async def get_versioned_user(current_user=Depends(get_current_user)):
+    """The caller's user document with its version counters read from MongoDB.
+
+    user_cache only sees this worker's writes, so its counters can lag a
+    write handled by another worker for up to the cache TTL; an ETag built
+    from them would answer 304 for stale data. A projected read on _id
+    checks them, and the full document is reloaded only when they moved.
+    """
     db = get_db()
-    from bson import ObjectId
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    if not user:
+    versions = await db.users.find_one({"_id": current_user["_id"]}, VERSION_FIELDS)
+    if versions is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
+    if all(versions.get(f, 0) == current_user.get(f, 0) for f in VERSION_FIELDS):
+        return current_user
+    user = await db.users.find_one({"_id": current_user["_id"]}, {"password_hash": 0})
+    if user is None or user.get("token_version", 0) != current_user.get("token_version", 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
+    await user_cache.set(str(user["_id"]), user)
     return user
+
+
+async def get_current_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    """{"_id": ...} for routes that only scope queries to the caller.
+
+    The token version is still checked against the (usually cached) user
+    document, so revoked tokens stop working on write routes too.
+    """
+    with span("get_current_user"):
+        payload = await _token_claims(credentials.credentials)
+        user = await _load_current_user(payload)
+    return {"_id": user["_id"]}
+
+
+async def require_ops_token(
+    credentials: HTTPAuthorizationCredentials = Depends(ops_security),
+):
+    """Guard operational endpoints; they do not exist unless OPS_TOKEN is set."""
+    if not settings.ops_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not credentials or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.ops_token.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ops token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def _enforce(limit: TokenBucketLimit, key: str) -> None:
+    allowed, retry_after = await limit.check(key)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+async def limit_login(request: Request):
+    """Throttle login attempts per client address."""
+    if settings.rate_limit_enabled:
+        await _enforce(login_limit, request.client.host if request.client else "unknown")
+
+
+async def limit_reads(current_user=Depends(get_current_user)):
+    """Throttle the expensive per-user reads (dashboard, predictions, ...)."""
+    if settings.rate_limit_enabled:
+        await _enforce(read_limit, str(current_user["_id"]))
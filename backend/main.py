@@ -1,13 +1,36 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import connect_db, close_db
-from routers import auth, cycles, symptoms, predictions, dashboard, reminders
+from config import settings
+from database import connect_db, close_db, get_db
+from services.auth_service import shutdown_hash_executor
+from services.metrics_service import MetricsMiddleware
+from services.reminder_scheduler import start_scheduler, stop_scheduler
+from services.change_watcher import start_change_watcher, stop_change_watcher
+from routers import auth, cycles, symptoms, predictions, dashboard, reminders, calendar, insights, imports, export, system, metrics
 import uvicorn
 
+
+# Runs once per worker process, so each worker owns its Motor client
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect_db()
+    if settings.reminder_scheduler_enabled:
+        await start_scheduler(get_db())
+    if settings.change_watcher_enabled:
+        await start_change_watcher(get_db())
+    yield
+    await stop_change_watcher()
+    await stop_scheduler()
+    await close_db()
+    shutdown_hash_executor()
+
+
 app = FastAPI(
     title="MyCare API",
     description="Backend for MyCare Period Cycle Tracker",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -17,16 +40,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Lifecycle events
-@app.on_event("startup")
-async def startup_db_client():
-    await connect_db()
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await close_db()
+# Request instrumentation; not installed at all when disabled
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 # Include Routers
 app.include_router(auth.router)
@@ -35,10 +54,17 @@ app.include_router(symptoms.router)
 app.include_router(predictions.router)
 app.include_router(dashboard.router)
 app.include_router(reminders.router)
+app.include_router(calendar.router)
+app.include_router(insights.router)
+app.include_router(imports.router)
+app.include_router(export.router)
+app.include_router(system.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to MyCare API", "status": "running"}
 
+# Development server; production uses serve.py
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
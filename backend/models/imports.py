@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row, not counting a CSV header
+    error: str
+
+
+class ImportResult(BaseModel):
+    received: int
+    upserted: int    # new entries
+    updated: int     # existing entries replaced
+    duplicates: int  # rows superseded by a later row for the same date
+    failed: int
+    errors: List[ImportRowError]  # first 100 failures
@@ -34,3 +34,8 @@ class SymptomResponse(BaseModel):
     discharge: Optional[str]
     notes: Optional[str]
     created_at: str
+
+
+class SymptomBulkResponse(BaseModel):
+    upserted: int  # new dates logged
+    updated: int   # existing dates replaced
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from database import get_db
-from models.user import UserRegister, UserLogin, Token, UserProfile, UserUpdateProfile
-from services.auth_service import hash_password, verify_password, create_access_token
-from dependencies import get_current_user
+from config import settings
+from models.user import UserRegister, UserLogin, Token, TokenPair, TokenRefresh, UserProfile, UserUpdateProfile
+from services.auth_service import (
+    REFRESH_TOKEN, hash_password_async, verify_password_async, create_access_token,
+    create_claims_tokens, decode_access_token,
+)
+from dependencies import get_current_identity, limit_login
+from services.cache_service import invalidate_user
+from services.cycle_stats_service import EMPTY_CYCLE_STATS
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -25,6 +32,14 @@ def user_to_profile(user: dict) -> UserProfile:
     )
 
 
+def issue_token(user: dict) -> Token:
+    if settings.claims_tokens_enabled:
+        access, refresh = create_claims_tokens(user["_id"], user.get("token_version", 0))
+        return Token(access_token=access, refresh_token=refresh, user=user_to_profile(user))
+    token = create_access_token({"sub": str(user["_id"]), "ver": user.get("token_version", 0)})
+    return Token(access_token=token, user=user_to_profile(user))
+
+
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(data: UserRegister):
     db = get_db()
@@ -38,7 +53,7 @@ async def register(data: UserRegister):
     new_user = {
         "name": data.name,
         "email": data.email,
-        "password_hash": hash_password(data.password),
+        "password_hash": await hash_password_async(data.password),
         "date_of_birth": data.date_of_birth,
         "age": data.age,
         "weight": data.weight,
@@ -46,29 +61,77 @@ async def register(data: UserRegister):
         "is_onboarded": False,
         "average_cycle_length": data.average_cycle_length or 28,
         "average_period_length": data.average_period_length or 5,
+        "cycle_stats": dict(EMPTY_CYCLE_STATS),
+        "token_version": 0,
         "created_at": now,
     }
     result = await db.users.insert_one(new_user)
     new_user["_id"] = result.inserted_id
-    token = create_access_token({"sub": str(result.inserted_id)})
-    return Token(access_token=token, user=user_to_profile(new_user))
+    return issue_token(new_user)
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
 async def login(data: UserLogin):
     db = get_db()
     user = await db.users.find_one({"email": data.email})
-    if not user or not verify_password(data.password, user["password_hash"]):
+    if not user or not await verify_password_async(data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
-    token = create_access_token({"sub": str(user["_id"])})
-    return Token(access_token=token, user=user_to_profile(user))
+    return issue_token(user)
+
+
+@router.post("/refresh", response_model=TokenPair, dependencies=[Depends(limit_login)])
+async def refresh_tokens(data: TokenRefresh):
+    """Exchange a refresh token for a new pair; each refresh token works once."""
+    payload = decode_access_token(data.refresh_token)
+    if (
+        not payload
+        or payload.get("typ") != REFRESH_TOKEN
+        or not payload.get("sub")
+        or not payload.get("jti")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    db = get_db()
+    user = await db.users.find_one({"_id": ObjectId(payload["sub"])}, {"token_version": 1})
+    if not user or user.get("token_version", 0) != payload.get("ver"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
+    try:
+        await db.refresh_tokens_used.insert_one({
+            "_id": payload["jti"],
+            "user_id": user["_id"],
+            "expires_at": datetime.utcfromtimestamp(payload["exp"]),
+        })
+    except DuplicateKeyError:
+        # A spent token came back: it leaked, or the legitimate client was
+        # beaten to it. Either way, end every session of this user.
+        await db.users.update_one({"_id": user["_id"]}, {"$inc": {"token_version": 1}})
+        await invalidate_user(user["_id"])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token already used",
+        )
+    access, refresh = create_claims_tokens(user["_id"], user.get("token_version", 0))
+    return TokenPair(access_token=access, refresh_token=refresh)
+
+
+@router.post("/revoke", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_tokens(current_user=Depends(get_current_identity)):
+    """Invalidate every refresh token (and claims access token) issued so far."""
+    db = get_db()
+    await db.users.update_one({"_id": current_user["_id"]}, {"$inc": {"token_version": 1}})
+    await invalidate_user(current_user["_id"])
 
 
 @router.put("/onboard", response_model=UserProfile)
-async def onboard_user(data: UserUpdateProfile, current_user=Depends(get_current_user)):
+async def onboard_user(data: UserUpdateProfile, current_user=Depends(get_current_identity)):
     db = get_db()
     
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
@@ -76,11 +139,13 @@ async def onboard_user(data: UserUpdateProfile, current_user=Depends(get_current
     
     result = await db.users.find_one_and_update(
         {"_id": current_user["_id"]},
-        {"$set": update_data},
+        {"$set": update_data, "$inc": {"profile_version": 1}},
+        projection={"password_hash": 0},
         return_document=True,
     )
     
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
-        
+
+    await invalidate_user(current_user["_id"])
     return user_to_profile(result)
@@ -0,0 +1,110 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from database import get_db
+from dependencies import get_current_user, limit_reads
+from services.prediction_cache import get_user_prediction
+from services.prediction_service import format_ordinal, to_ordinal
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+# Bit flags for each entry of the "days" array
+LOGGED_PERIOD = 1
+PREDICTED_PERIOD = 2
+FERTILE = 4
+OVULATION = 8
+HAS_SYMPTOMS = 16
+
+MAX_RANGE_DAYS = 366
+MAX_PERIOD_DAYS = 14
+
+
+def _mark(days: list, first: int, start: int, end: int, flag: int) -> None:
+    for day in range(max(start, first), min(end, first + len(days) - 1) + 1):
+        days[day - first] |= flag
+
+
+@router.get("", dependencies=[Depends(limit_reads)])
+async def get_calendar(
+    from_date: str = Query(..., alias="from"),
+    to_date: str = Query(..., alias="to"),
+    current_user=Depends(get_current_user),
+):
+    first = to_ordinal(from_date)
+    last = to_ordinal(to_date)
+    if first is None or last is None or last < first:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    if last - first + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range exceeds {MAX_RANGE_DAYS} days")
+    # Dates are stored as zero-padded strings and range-queried as strings,
+    # so non-padded input ("2024-10-9") must not reach the query as-is
+    from_date, to_date = format_ordinal(first), format_ordinal(last)
+
+    db = get_db()
+    user_id = current_user["_id"]
+    # A period that overlaps the range started at most MAX_PERIOD_DAYS before it
+    cycles_cursor = db.cycles.find(
+        {
+            "user_id": user_id,
+            "start_date": {"$gte": format_ordinal(first - MAX_PERIOD_DAYS), "$lte": to_date},
+        },
+        {"_id": 0, "start_date": 1, "end_date": 1, "flow_level": 1},
+    ).sort("start_date", 1)
+    symptoms_cursor = db.symptoms.find(
+        {"user_id": user_id, "date": {"$gte": from_date, "$lte": to_date}},
+        {"_id": 0, "user_id": 0, "created_at": 0},
+    ).sort("date", 1)
+
+    prediction, cycles, symptoms = await asyncio.gather(
+        get_user_prediction(db, current_user),
+        cycles_cursor.to_list(length=None),
+        symptoms_cursor.to_list(length=None),
+    )
+
+    days = [0] * (last - first + 1)
+
+    visible_cycles = []
+    for cycle in cycles:
+        start = to_ordinal(cycle["start_date"])
+        if start is None:
+            continue
+        end = to_ordinal(cycle.get("end_date")) if cycle.get("end_date") else None
+        end = end if end is not None and end >= start else start
+        if end < first or start > last:
+            continue
+        _mark(days, first, start, end, LOGGED_PERIOD)
+        visible_cycles.append(cycle)
+
+    if prediction.get("next_period_date"):
+        ovulation = to_ordinal(prediction["ovulation_date"])
+        _mark(days, first, to_ordinal(prediction["fertile_window_start"]),
+              to_ordinal(prediction["fertile_window_end"]), FERTILE)
+        _mark(days, first, ovulation, ovulation, OVULATION)
+        for future in prediction["future_predictions"]:
+            future_ovulation = to_ordinal(future["ovulation_date"])
+            _mark(days, first, to_ordinal(future["start_date"]),
+                  to_ordinal(future["end_date"]), PREDICTED_PERIOD)
+            _mark(days, first, future_ovulation - 5, future_ovulation + 1, FERTILE)
+            _mark(days, first, future_ovulation, future_ovulation, OVULATION)
+
+    visible_symptoms = []
+    for symptom in symptoms:
+        day = to_ordinal(symptom["date"])
+        if day is None or not first <= day <= last:
+            continue
+        days[day - first] |= HAS_SYMPTOMS
+        visible_symptoms.append(symptom)
+
+    return {
+        "from": from_date,
+        "to": to_date,
+        "flags": {
+            "logged_period": LOGGED_PERIOD,
+            "predicted_period": PREDICTED_PERIOD,
+            "fertile": FERTILE,
+            "ovulation": OVULATION,
+            "has_symptoms": HAS_SYMPTOMS,
+        },
+        "days": days,
+        "cycles": visible_cycles,
+        "symptoms": visible_symptoms,
+    }
@@ -1,15 +1,36 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from datetime import datetime
-from typing import List
+from typing import Annotated, List, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from database import get_db
 from models.cycle import CycleCreate, CycleUpdate, CycleResponse
-from dependencies import get_current_user
+from dependencies import get_current_identity, get_versioned_user
+from services.etag_service import cache_headers, etag_matches, not_modified, user_etag
+from services.prediction_cache import mark_cycles_changed
+from services.reminder_scheduler import reset_cycle_reminders
+from services.cycle_stats_service import (
+    cycle_inserted_update, cycle_deleted_update, cycle_updated_update, cycle_stats_lock,
+)
+from services.pagination import (
+    NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_after, ndjson_rows,
+)
 
 router = APIRouter(prefix="/cycles", tags=["Cycles"])
 
 
-def cycle_to_response(cycle: dict) -> CycleResponse:
+# List reads fetch only what the response shows; user_id is the caller's,
+# so it is passed in rather than read back from every document
+CYCLE_FIELDS = {
+    "start_date": 1, "end_date": 1, "flow_level": 1, "notes": 1, "created_at": 1,
+}
+
+
+def cycle_to_dict(cycle: dict, user_id=None) -> dict:
+    """Plain-dict CycleResponse, for list endpoints that skip model validation."""
     duration = None
     if cycle.get("end_date") and cycle.get("start_date"):
         try:
@@ -18,20 +39,24 @@ def cycle_to_response(cycle: dict) -> CycleResponse:
             duration = (e - s).days + 1
         except Exception:
             pass
-    return CycleResponse(
-        id=str(cycle["_id"]),
-        user_id=str(cycle["user_id"]),
-        start_date=cycle["start_date"],
-        end_date=cycle.get("end_date"),
-        flow_level=cycle.get("flow_level", "medium"),
-        duration=duration,
-        notes=cycle.get("notes"),
-        created_at=cycle["created_at"].isoformat() if isinstance(cycle["created_at"], datetime) else cycle["created_at"],
-    )
+    return {
+        "id": str(cycle["_id"]),
+        "user_id": str(cycle["user_id"] if user_id is None else user_id),
+        "start_date": cycle["start_date"],
+        "end_date": cycle.get("end_date"),
+        "flow_level": cycle.get("flow_level", "medium"),
+        "duration": duration,
+        "notes": cycle.get("notes"),
+        "created_at": cycle["created_at"].isoformat() if isinstance(cycle["created_at"], datetime) else cycle["created_at"],
+    }
+
+
+def cycle_to_response(cycle: dict) -> CycleResponse:
+    return CycleResponse(**cycle_to_dict(cycle))
 
 
 @router.post("", response_model=CycleResponse, status_code=status.HTTP_201_CREATED)
-async def log_cycle(data: CycleCreate, current_user=Depends(get_current_user)):
+async def log_cycle(data: CycleCreate, current_user=Depends(get_current_identity)):
     db = get_db()
     now = datetime.utcnow()
     doc = {
@@ -42,21 +67,70 @@ async def log_cycle(data: CycleCreate, current_user=Depends(get_current_user)):
         "notes": data.notes,
         "created_at": now,
     }
-    result = await db.cycles.insert_one(doc)
-    doc["_id"] = result.inserted_id
+    async with cycle_stats_lock(db, current_user["_id"]) as lock:
+        try:
+            result = await db.cycles.insert_one(doc)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A cycle starting on this date is already logged",
+            )
+        doc["_id"] = result.inserted_id
+        await mark_cycles_changed(
+            db, current_user["_id"], await cycle_inserted_update(db, doc), lock=lock
+        )
+    await reset_cycle_reminders(db, current_user["_id"])
     return cycle_to_response(doc)
 
 
 @router.get("", response_model=List[CycleResponse])
-async def get_cycles(current_user=Depends(get_current_user)):
+async def get_cycles(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user=Depends(get_versioned_user),
+):
+    # Each page (limit/cursor/format) gets its own tag from the cycle version
+    etag = user_etag(current_user, current_user.get("cycles_version", 0), limit, cursor, format)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     db = get_db()
-    cursor = db.cycles.find({"user_id": current_user["_id"]}).sort("start_date", -1)
-    cycles = await cursor.to_list(length=100)
-    return [cycle_to_response(c) for c in cycles]
+    query = {"user_id": current_user["_id"]}
+    if cursor:
+        position = decode_cursor(cursor)
+        after = keyset_after("start_date", *position) if position and len(position) == 2 else None
+        if after is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query.update(after)
+
+    # Newest first, with _id as a tiebreaker so pages never overlap
+    db_cursor = db.cycles.find(query, CYCLE_FIELDS).sort([("start_date", -1), ("_id", -1)])
+
+    if format == "ndjson":
+        if limit:
+            db_cursor = db_cursor.limit(limit)
+        return StreamingResponse(
+            ndjson_rows(db_cursor, lambda c: orjson.dumps(cycle_to_dict(c, current_user["_id"]))),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=cache_headers(etag),
+        )
+
+    limit = limit or 100
+    cycles = await db_cursor.limit(limit + 1).to_list(length=limit + 1)
+    headers = cache_headers(etag)
+    if len(cycles) > limit:
+        cycles = cycles[:limit]
+        last = cycles[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last["start_date"], last["_id"])
+    # Rows are built as plain dicts; returning the response directly skips a
+    # second validation pass against response_model.
+    return ORJSONResponse([cycle_to_dict(c, current_user["_id"]) for c in cycles], headers=headers)
 
 
 @router.get("/{cycle_id}", response_model=CycleResponse)
-async def get_cycle(cycle_id: str, current_user=Depends(get_current_user)):
+async def get_cycle(cycle_id: str, current_user=Depends(get_current_identity)):
     db = get_db()
     cycle = await db.cycles.find_one(
         {"_id": ObjectId(cycle_id), "user_id": current_user["_id"]}
@@ -68,27 +142,44 @@ async def get_cycle(cycle_id: str, current_user=Depends(get_current_user)):
 
 @router.put("/{cycle_id}", response_model=CycleResponse)
 async def update_cycle(
-    cycle_id: str, data: CycleUpdate, current_user=Depends(get_current_user)
+    cycle_id: str, data: CycleUpdate, current_user=Depends(get_current_identity)
 ):
     db = get_db()
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail="No update data provided")
-    result = await db.cycles.find_one_and_update(
-        {"_id": ObjectId(cycle_id), "user_id": current_user["_id"]},
-        {"$set": update_data},
-        return_document=True,
-    )
-    if not result:
-        raise HTTPException(status_code=404, detail="Cycle not found")
+    async with cycle_stats_lock(db, current_user["_id"]) as lock:
+        try:
+            before = await db.cycles.find_one_and_update(
+                {"_id": ObjectId(cycle_id), "user_id": current_user["_id"]},
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A cycle starting on this date is already logged",
+            )
+        if not before:
+            raise HTTPException(status_code=404, detail="Cycle not found")
+        result = {**before, **update_data}
+        await mark_cycles_changed(
+            db, current_user["_id"], cycle_updated_update(before, result), lock=lock
+        )
+    await reset_cycle_reminders(db, current_user["_id"])
     return cycle_to_response(result)
 
 
 @router.delete("/{cycle_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_cycle(cycle_id: str, current_user=Depends(get_current_user)):
+async def delete_cycle(cycle_id: str, current_user=Depends(get_current_identity)):
     db = get_db()
-    result = await db.cycles.delete_one(
-        {"_id": ObjectId(cycle_id), "user_id": current_user["_id"]}
-    )
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Cycle not found")
+    async with cycle_stats_lock(db, current_user["_id"]) as lock:
+        deleted = await db.cycles.find_one_and_delete(
+            {"_id": ObjectId(cycle_id), "user_id": current_user["_id"]}
+        )
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Cycle not found")
+        await mark_cycles_changed(
+            db, current_user["_id"], await cycle_deleted_update(db, deleted), lock=lock
+        )
+    await reset_cycle_reminders(db, current_user["_id"])
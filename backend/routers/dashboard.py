@@ -1,36 +1,54 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import ORJSONResponse
 from database import get_db
-from dependencies import get_current_user
-from services.prediction_service import predict_next_period, calculate_cycle_stats
+from dependencies import get_versioned_user, limit_reads
+from services.coalesce import read_flight
+from services.etag_service import cache_headers, etag_matches, not_modified, user_etag
+from services.prediction_cache import get_user_summary
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
-@router.get("")
-async def get_dashboard_data(current_user=Depends(get_current_user)):
-    db = get_db()
-    
-    # 1. Get cycles
-    cursor = db.cycles.find({"user_id": current_user["_id"]}).sort("start_date", 1)
-    cycles = await cursor.to_list(length=100)
-    
-    # 2. Get predictions
-    prediction = predict_next_period(
-        cycles,
-        user_avg_cycle=current_user.get("average_cycle_length", 28),
-        user_avg_period=current_user.get("average_period_length", 5)
+@router.get("", dependencies=[Depends(limit_reads)])
+async def get_dashboard_data(
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user=Depends(get_versioned_user),
+):
+    versions = (
+        current_user.get("cycles_version", 0),
+        current_user.get("symptoms_version", 0),
+        current_user.get("profile_version", 0),
     )
-    
-    # 3. Get recent symptoms (last 7 days)
+    # Checked before any read; the symptom window and prediction move daily
+    etag = user_etag(current_user, *versions, dated=True)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # Identical concurrent requests (remounts, reconnect storms) share one build
+    key = "dashboard:{}:{}:{}:{}".format(current_user["_id"], *versions)
+    data = await read_flight.do(key, lambda: _build_dashboard(current_user))
+    return ORJSONResponse(data, headers=cache_headers(etag))
+
+
+async def _build_dashboard(current_user):
+    db = get_db()
+
     today = datetime.utcnow().strftime("%Y-%m-%d")
     week_ago = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
-    
     symptoms_cursor = db.symptoms.find({
         "user_id": current_user["_id"],
         "date": {"$gte": week_ago, "$lte": today}
     }).sort("date", -1)
-    recent_symptoms = await symptoms_cursor.to_list(length=7)
+
+    # Predictions/cycle stats (cached per user) and the last 7 days of
+    # symptoms are independent, so both reads run concurrently
+    cached, recent_symptoms = await asyncio.gather(
+        get_user_summary(db, current_user),
+        symptoms_cursor.to_list(length=7),
+    )
     
     # Format symptom IDs
     for s in recent_symptoms:
@@ -45,7 +63,7 @@ async def get_dashboard_data(current_user=Depends(get_current_user)):
             "name": current_user["name"],
             "email": current_user["email"]
         },
-        "prediction": prediction,
+        "prediction": cached["prediction"],
         "recent_symptoms": recent_symptoms,
-        "stats": calculate_cycle_stats(cycles)
+        "stats": cached["stats"]
     }
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from database import get_db
+from dependencies import get_current_user, limit_reads
+from routers.auth import user_to_profile
+from routers.cycles import cycle_to_dict
+from routers.reminders import REMINDER_FIELDS, reminder_to_dict
+from routers.symptoms import symptom_to_dict
+from services.export_service import ndjson_export, zip_csv_export
+from services.pagination import NDJSON_MEDIA_TYPE
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Documents fetched per round trip; only one batch is held at a time
+EXPORT_BATCH_SIZE = 500
+
+CYCLE_COLUMNS = ("id", "start_date", "end_date", "flow_level", "duration", "notes", "created_at")
+SYMPTOM_COLUMNS = (
+    "id", "date", "cramps", "bloating", "headache", "backache", "mood", "energy",
+    "breast_tenderness", "acne", "nausea", "discharge", "notes", "created_at",
+)
+REMINDER_COLUMNS = ("id", "type", "time", "enabled", "days_before", "created_at")
+
+
+async def _rows(cursor, serialize: Callable[[dict], Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    async for doc in cursor:
+        yield serialize(doc)
+
+
+async def _profile(user: dict) -> AsyncIterator[Dict[str, Any]]:
+    yield user_to_profile(user).model_dump(mode="json")
+
+
+def _sections(db, user: dict):
+    user_id = user["_id"]
+    cycles = db.cycles.find({"user_id": user_id}).sort([("start_date", 1), ("_id", 1)])
+    symptoms = db.symptoms.find({"user_id": user_id}).sort("date", 1)
+    reminders = db.reminders.find({"user_id": user_id}, REMINDER_FIELDS)
+    return (
+        ("profile", _profile(user)),
+        ("cycle", _rows(cycles.batch_size(EXPORT_BATCH_SIZE), cycle_to_dict)),
+        ("symptom", _rows(symptoms.batch_size(EXPORT_BATCH_SIZE), symptom_to_dict)),
+        ("reminder", _rows(reminders, reminder_to_dict)),
+    )
+
+
+@router.get("", dependencies=[Depends(limit_reads)])
+async def export_account(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user=Depends(get_current_user),
+):
+    """Stream the whole account: NDJSON lines or a zip of CSV files.
+
+    Rows go from the Motor cursors straight into the response, so memory
+    stays flat regardless of history length.
+    """
+    db = get_db()
+    profile, cycles, symptoms, reminders = _sections(db, current_user)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+
+    if format == "ndjson":
+        body = ndjson_export((profile, cycles, symptoms, reminders))
+        media_type, filename = NDJSON_MEDIA_TYPE, f"mycare-export-{stamp}.ndjson"
+    else:
+        profile_columns = tuple(user_to_profile(current_user).model_dump().keys())
+        body = zip_csv_export((
+            ("profile.csv", profile_columns, profile[1]),
+            ("cycles.csv", CYCLE_COLUMNS, cycles[1]),
+            ("symptoms.csv", SYMPTOM_COLUMNS, symptoms[1]),
+            ("reminders.csv", REMINDER_COLUMNS, reminders[1]),
+        ))
+        media_type, filename = "application/zip", f"mycare-export-{stamp}.zip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, Query, Request
+from database import get_db
+from config import settings
+from models.cycle import CycleCreate
+from models.imports import ImportResult
+from models.symptom import SymptomCreate
+from dependencies import get_current_identity
+from services.cycle_stats_service import cycle_stats_lock, rebuild_cycle_stats
+from services.import_service import ImportWriter, import_rows
+from services.insights_service import mark_symptoms_changed
+from services.prediction_cache import mark_cycles_changed
+from services.reminder_scheduler import reset_cycle_reminders
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+FORMAT_QUERY = Query("csv", pattern="^(csv|ndjson)$")
+
+
+def _cycle_doc(entry: CycleCreate, now) -> dict:
+    return {
+        "start_date": entry.start_date,
+        "end_date": entry.end_date,
+        "flow_level": entry.flow_level or "medium",
+        "notes": entry.notes,
+        "created_at": now,
+    }
+
+
+def _symptom_doc(entry: SymptomCreate, now) -> dict:
+    doc = entry.model_dump()
+    doc["created_at"] = now
+    return doc
+
+
+@router.post("/cycles", response_model=ImportResult)
+async def import_cycles(
+    request: Request,
+    format: str = FORMAT_QUERY,
+    current_user=Depends(get_current_identity),
+):
+    """Import cycles from a streamed CSV (with header) or NDJSON body.
+
+    Rows are upserted on (user, start_date), so re-importing a file is safe.
+    """
+    db = get_db()
+    writer = ImportWriter(db.cycles, current_user["_id"], "start_date", settings.import_batch_size)
+    result = await import_rows(
+        request.stream(), format, writer, CycleCreate, ("start_date", "end_date"), _cycle_doc
+    )
+    if result["upserted"] or result["updated"]:
+        # One full recomputation instead of per-row incremental updates, under
+        # the lease so a concurrent manual log cannot apply a delta mid-rebuild
+        async with cycle_stats_lock(db, current_user["_id"]):
+            await rebuild_cycle_stats(db, current_user["_id"])
+        await mark_cycles_changed(db, current_user["_id"])
+        await reset_cycle_reminders(db, current_user["_id"])
+    return result
+
+
+@router.post("/symptoms", response_model=ImportResult)
+async def import_symptoms(
+    request: Request,
+    format: str = FORMAT_QUERY,
+    current_user=Depends(get_current_identity),
+):
+    """Import symptom logs from a streamed CSV (with header) or NDJSON body.
+
+    Rows are upserted on (user, date); the last row for a date wins.
+    """
+    db = get_db()
+    writer = ImportWriter(db.symptoms, current_user["_id"], "date", settings.import_batch_size)
+    result = await import_rows(
+        request.stream(), format, writer, SymptomCreate, ("date",), _symptom_doc
+    )
+    if result["upserted"] or result["updated"]:
+        await mark_symptoms_changed(db, current_user["_id"])
+    return result
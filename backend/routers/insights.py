@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from database import get_db, get_server_version
+from dependencies import get_current_user, limit_reads
+from services.insights_service import MIN_SERVER_VERSION, get_user_insights
+
+router = APIRouter(prefix="/insights", tags=["Insights"])
+
+
+@router.get("", dependencies=[Depends(limit_reads)])
+async def get_insights(current_user=Depends(get_current_user)):
+    version = get_server_version()
+    if version is not None and version < MIN_SERVER_VERSION:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Insights need MongoDB {}.{} or newer".format(*MIN_SERVER_VERSION),
+        )
+    db = get_db()
+    return await get_user_insights(db, current_user)
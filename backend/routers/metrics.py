@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from services.db_monitoring import db_metrics
+from services.metrics_service import render_metrics
+from dependencies import require_ops_token
+
+router = APIRouter(tags=["System"], dependencies=[Depends(require_ops_token)])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, span and MongoDB metrics."""
+    return PlainTextResponse(render_metrics(db_metrics.snapshot()), media_type="text/plain; version=0.0.4")
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import ORJSONResponse
+from typing import Annotated, Optional
 from database import get_db
-from services.prediction_service import predict_next_period
-from dependencies import get_current_user
+from services.prediction_cache import get_user_prediction
+from dependencies import get_versioned_user, limit_reads
+from services.coalesce import read_flight
+from services.etag_service import cache_headers, etag_matches, not_modified, user_etag
 
 router = APIRouter(prefix="/predictions", tags=["Predictions"])
 
 
-@router.get("")
-async def get_predictions(current_user=Depends(get_current_user)):
+@router.get("", dependencies=[Depends(limit_reads)])
+async def get_predictions(
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user=Depends(get_versioned_user),
+):
+    etag = user_etag(
+        current_user,
+        current_user.get("cycles_version", 0),
+        current_user.get("profile_version", 0),
+        dated=True,
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     db = get_db()
-    
-    # Get all cycles to calculate stats
-    cursor = db.cycles.find({"user_id": current_user["_id"]}).sort("start_date", 1)
-    cycles = await cursor.to_list(length=100)
-    
-    prediction = predict_next_period(
-        cycles,
-        user_avg_cycle=current_user.get("average_cycle_length", 28),
-        user_avg_period=current_user.get("average_period_length", 5)
+    # Same counters as the ETag, so a request never joins a read built for older data
+    key = "predictions:{}:{}:{}".format(
+        current_user["_id"],
+        current_user.get("cycles_version", 0),
+        current_user.get("profile_version", 0),
     )
-    
-    return prediction
+    prediction = await read_flight.do(key, lambda: get_user_prediction(db, current_user))
+    return ORJSONResponse(prediction, headers=cache_headers(etag))
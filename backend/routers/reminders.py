@@ -1,61 +1,75 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
-from typing import List
+from typing import Annotated, List, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
 from database import get_db
 from models.reminder import ReminderCreate, ReminderResponse
-from dependencies import get_current_user
+from dependencies import get_current_identity, get_versioned_user
+from services.cache_service import bump_user_version
+from services.etag_service import cache_headers, etag_matches, not_modified, user_etag
 
 router = APIRouter(prefix="/reminders", tags=["Reminders"])
 
+REMINDER_FIELDS = {
+    "user_id": 1, "type": 1, "time": 1, "enabled": 1, "days_before": 1, "created_at": 1,
+}
+
+
+def reminder_to_dict(reminder: dict) -> dict:
+    """Plain-dict ReminderResponse, for list endpoints that skip model validation."""
+    return {
+        "id": str(reminder["_id"]),
+        "user_id": str(reminder["user_id"]),
+        "type": reminder["type"],
+        "time": reminder["time"],
+        "enabled": reminder.get("enabled", True),
+        "days_before": reminder.get("days_before", 1),
+        "created_at": reminder["created_at"].isoformat() if isinstance(reminder["created_at"], datetime) else reminder["created_at"],
+    }
+
 
 def reminder_to_response(reminder: dict) -> ReminderResponse:
-    return ReminderResponse(
-        id=str(reminder["_id"]),
-        user_id=str(reminder["user_id"]),
-        type=reminder["type"],
-        time=reminder["time"],
-        enabled=reminder.get("enabled", True),
-        days_before=reminder.get("days_before", 1),
-        created_at=reminder["created_at"].isoformat() if isinstance(reminder["created_at"], datetime) else reminder["created_at"],
-    )
+    return ReminderResponse(**reminder_to_dict(reminder))
 
 
 @router.post("", response_model=ReminderResponse, status_code=status.HTTP_201_CREATED)
-async def create_reminder(data: ReminderCreate, current_user=Depends(get_current_user)):
+async def create_reminder(data: ReminderCreate, current_user=Depends(get_current_identity)):
     db = get_db()
     now = datetime.utcnow()
-    
-    # Check if a reminder of this type already exists for the user
-    existing = await db.reminders.find_one({
-        "user_id": current_user["_id"],
-        "type": data.type
-    })
-    
+
     doc = data.model_dump()
     doc["user_id"] = current_user["_id"]
     doc["created_at"] = now
-    
-    if existing:
-        await db.reminders.replace_one({"_id": existing["_id"]}, doc)
-        doc["_id"] = existing["_id"]
-    else:
-        result = await db.reminders.insert_one(doc)
-        doc["_id"] = result.inserted_id
-        
-    return reminder_to_response(doc)
+
+    # One reminder per user and type, enforced by the unique (user_id, type) index
+    saved = await db.reminders.find_one_and_replace(
+        {"user_id": current_user["_id"], "type": data.type},
+        doc,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    await bump_user_version(db, current_user["_id"], "reminders_version")
+    return reminder_to_response(saved)
 
 
 @router.get("", response_model=List[ReminderResponse])
-async def get_reminders(current_user=Depends(get_current_user)):
+async def get_reminders(
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    current_user=Depends(get_versioned_user),
+):
+    etag = user_etag(current_user, current_user.get("reminders_version", 0))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     db = get_db()
-    cursor = db.reminders.find({"user_id": current_user["_id"]})
+    cursor = db.reminders.find({"user_id": current_user["_id"]}, REMINDER_FIELDS)
     reminders = await cursor.to_list(length=100)
-    return [reminder_to_response(r) for r in reminders]
+    return ORJSONResponse([reminder_to_dict(r) for r in reminders], headers=cache_headers(etag))
 
 
 @router.delete("/{reminder_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_reminder(reminder_id: str, current_user=Depends(get_current_user)):
+async def delete_reminder(reminder_id: str, current_user=Depends(get_current_identity)):
     db = get_db()
     result = await db.reminders.delete_one({
         "_id": ObjectId(reminder_id),
@@ -63,3 +77,4 @@ async def delete_reminder(reminder_id: str, current_user=Depends(get_current_use
     })
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Reminder not found")
+    await bump_user_version(db, current_user["_id"], "reminders_version")
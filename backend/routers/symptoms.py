@@ -1,64 +1,109 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from bson import ObjectId
+from pymongo import ReplaceOne, ReturnDocument
 from database import get_db
-from models.symptom import SymptomCreate, SymptomResponse
-from dependencies import get_current_user
+from models.symptom import SymptomCreate, SymptomResponse, SymptomBulkResponse
+from dependencies import get_current_identity
+from services.insights_service import mark_symptoms_changed
+from services.pagination import (
+    NDJSON_MEDIA_TYPE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, ndjson_rows,
+)
 
 router = APIRouter(prefix="/symptoms", tags=["Symptoms"])
 
 
+# List reads fetch only what the response shows; user_id is the caller's,
+# so it is passed in rather than read back from every document
+SYMPTOM_FIELDS = {
+    "date": 1, "cramps": 1, "bloating": 1, "headache": 1, "backache": 1,
+    "mood": 1, "energy": 1, "breast_tenderness": 1, "acne": 1, "nausea": 1,
+    "discharge": 1, "notes": 1, "created_at": 1,
+}
+
+
+def symptom_to_dict(symptom: dict, user_id=None) -> dict:
+    """Plain-dict SymptomResponse, for list endpoints that skip model validation."""
+    return {
+        "id": str(symptom["_id"]),
+        "user_id": str(symptom["user_id"] if user_id is None else user_id),
+        "date": symptom["date"],
+        "cramps": symptom.get("cramps", 0),
+        "bloating": symptom.get("bloating", 0),
+        "headache": symptom.get("headache", 0),
+        "backache": symptom.get("backache", 0),
+        "mood": symptom.get("mood"),
+        "energy": symptom.get("energy"),
+        "breast_tenderness": symptom.get("breast_tenderness", False),
+        "acne": symptom.get("acne", False),
+        "nausea": symptom.get("nausea", False),
+        "discharge": symptom.get("discharge"),
+        "notes": symptom.get("notes"),
+        "created_at": symptom["created_at"].isoformat() if isinstance(symptom["created_at"], datetime) else symptom["created_at"],
+    }
+
+
 def symptom_to_response(symptom: dict) -> SymptomResponse:
-    return SymptomResponse(
-        id=str(symptom["_id"]),
-        user_id=str(symptom["user_id"]),
-        date=symptom["date"],
-        cramps=symptom.get("cramps", 0),
-        bloating=symptom.get("bloating", 0),
-        headache=symptom.get("headache", 0),
-        backache=symptom.get("backache", 0),
-        mood=symptom.get("mood"),
-        energy=symptom.get("energy"),
-        breast_tenderness=symptom.get("breast_tenderness", False),
-        acne=symptom.get("acne", False),
-        nausea=symptom.get("nausea", False),
-        discharge=symptom.get("discharge"),
-        notes=symptom.get("notes"),
-        created_at=symptom["created_at"].isoformat() if isinstance(symptom["created_at"], datetime) else symptom["created_at"],
-    )
+    return SymptomResponse(**symptom_to_dict(symptom))
 
 
 @router.post("", response_model=SymptomResponse, status_code=status.HTTP_201_CREATED)
-async def log_symptom(data: SymptomCreate, current_user=Depends(get_current_user)):
+async def log_symptom(data: SymptomCreate, current_user=Depends(get_current_identity)):
     db = get_db()
     now = datetime.utcnow()
-    
-    # Check if entry for this date already exists
-    existing = await db.symptoms.find_one({
-        "user_id": current_user["_id"],
-        "date": data.date
-    })
-    
+
     doc = data.model_dump()
     doc["user_id"] = current_user["_id"]
     doc["created_at"] = now
-    
-    if existing:
-        await db.symptoms.replace_one({"_id": existing["_id"]}, doc)
-        doc["_id"] = existing["_id"]
-    else:
-        result = await db.symptoms.insert_one(doc)
-        doc["_id"] = result.inserted_id
-        
-    return symptom_to_response(doc)
+
+    # One entry per user and date, enforced by the unique (user_id, date) index
+    saved = await db.symptoms.find_one_and_replace(
+        {"user_id": current_user["_id"], "date": data.date},
+        doc,
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    await mark_symptoms_changed(db, current_user["_id"])
+    return symptom_to_response(saved)
+
+
+@router.post("/bulk", response_model=SymptomBulkResponse)
+async def log_symptoms_bulk(data: List[SymptomCreate], current_user=Depends(get_current_identity)):
+    if not data:
+        raise HTTPException(status_code=400, detail="No symptom logs provided")
+    db = get_db()
+    now = datetime.utcnow()
+
+    # Last entry wins when the same date appears twice in one request
+    by_date = {entry.date: entry for entry in data}
+    operations = []
+    for date, entry in by_date.items():
+        doc = entry.model_dump()
+        doc["user_id"] = current_user["_id"]
+        doc["created_at"] = now
+        operations.append(
+            ReplaceOne({"user_id": current_user["_id"], "date": date}, doc, upsert=True)
+        )
+
+    result = await db.symptoms.bulk_write(operations, ordered=False)
+    await mark_symptoms_changed(db, current_user["_id"])
+    return SymptomBulkResponse(
+        upserted=result.upserted_count,
+        updated=result.matched_count,
+    )
 
 
 @router.get("", response_model=List[SymptomResponse])
 async def get_symptoms(
-    start_date: str = None, 
-    end_date: str = None, 
-    current_user=Depends(get_current_user)
+    start_date: str = None,
+    end_date: str = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user=Depends(get_current_identity)
 ):
     db = get_db()
     query = {"user_id": current_user["_id"]}
@@ -69,14 +114,35 @@ async def get_symptoms(
             query["date"]["$gte"] = start_date
         if end_date:
             query["date"]["$lte"] = end_date
-            
-    cursor = db.symptoms.find(query).sort("date", -1)
-    symptoms = await cursor.to_list(length=100)
-    return [symptom_to_response(s) for s in symptoms]
+
+    # Dates are unique per user, so the date alone is a stable keyset position
+    if cursor:
+        position = decode_cursor(cursor)
+        if not position or len(position) != 1:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query.setdefault("date", {})["$lt"] = position[0]
+
+    db_cursor = db.symptoms.find(query, SYMPTOM_FIELDS).sort("date", -1)
+
+    if format == "ndjson":
+        if limit:
+            db_cursor = db_cursor.limit(limit)
+        return StreamingResponse(
+            ndjson_rows(db_cursor, lambda s: orjson.dumps(symptom_to_dict(s, current_user["_id"]))),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    limit = limit or 100
+    symptoms = await db_cursor.limit(limit + 1).to_list(length=limit + 1)
+    headers = {}
+    if len(symptoms) > limit:
+        symptoms = symptoms[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(symptoms[-1]["date"])
+    return ORJSONResponse([symptom_to_dict(s, current_user["_id"]) for s in symptoms], headers=headers)
 
 
 @router.get("/{date}", response_model=SymptomResponse)
-async def get_symptom_by_date(date: str, current_user=Depends(get_current_user)):
+async def get_symptom_by_date(date: str, current_user=Depends(get_current_identity)):
     db = get_db()
     symptom = await db.symptoms.find_one({
         "user_id": current_user["_id"],
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends
+from services.cache_service import user_cache, token_cache
+from services import prediction_cache, insights_service
+from services.auth_service import hash_pool_stats
+from services import change_watcher, reminder_scheduler
+from services.coalesce import read_flight
+from services.db_monitoring import db_metrics
+from dependencies import login_limit, read_limit, require_ops_token
+
+router = APIRouter(prefix="/system", tags=["System"], dependencies=[Depends(require_ops_token)])
+
+
+def _cache_stats(cache) -> dict:
+    return cache.stats() if hasattr(cache, "stats") else {}
+
+
+@router.get("/stats")
+async def get_stats():
+    return {
+        "caches": {
+            "user": _cache_stats(user_cache),
+            "token": _cache_stats(token_cache),
+            "prediction": _cache_stats(prediction_cache.prediction_cache),
+            "insights": _cache_stats(insights_service.insights_cache),
+        },
+        "database": db_metrics.snapshot(),
+        "password_hashing": dict(hash_pool_stats),
+        "coalescing": dict(read_flight.stats),
+        "rate_limits": {
+            limit.name: dict(limit.stats) for limit in (login_limit, read_limit)
+        },
+        "reminder_scheduler": (
+            dict(reminder_scheduler.scheduler.stats) if reminder_scheduler.scheduler else None
+        ),
+        "change_watcher": (
+            dict(change_watcher.watcher.stats) if change_watcher.watcher else None
+        ),
+    }
@@ -0,0 +1,128 @@
+"""Dashboard latency: serial reads vs. the concurrent handler.
+
+Seeds one user with a cycle and symptom history, then times GET /dashboard's
+handler on a cold prediction cache, against a reproduction of the old serial
+version. --latency-ms adds a fixed delay to every Mongo round trip, standing
+in for a database that is not on localhost.
+
+    python -m scripts.bench_dashboard --cycles 100 --latency-ms 5
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+import database
+from database import connect_db, close_db
+from routers.dashboard import get_dashboard_data
+from services import prediction_cache
+from services.prediction_service import predict_next_period, calculate_cycle_stats
+
+
+class DelayedCursor:
+    def __init__(self, cursor, delay):
+        self._cursor = cursor
+        self._delay = delay
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self._delay)
+        return await self._cursor.to_list(length=length)
+
+
+class DelayedCollection:
+    def __init__(self, collection, delay):
+        self._collection = collection
+        self._delay = delay
+
+    def find(self, *args, **kwargs):
+        return DelayedCursor(self._collection.find(*args, **kwargs), self._delay)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class DelayedDatabase:
+    def __init__(self, db, delay):
+        self._db = db
+        self._delay = delay
+
+    def __getattr__(self, name):
+        return DelayedCollection(self._db[name], self._delay)
+
+    def __getitem__(self, name):
+        return DelayedCollection(self._db[name], self._delay)
+
+
+async def serial_dashboard(db, user):
+    """The handler as it was: cycles, prediction, then symptoms, one after another."""
+    cycles = await db.cycles.find({"user_id": user["_id"]}).sort("start_date", 1).to_list(length=100)
+    prediction = predict_next_period(cycles)
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    week_ago = (datetime.utcnow() - timedelta(days=7)).strftime("%Y-%m-%d")
+    symptoms = await db.symptoms.find({
+        "user_id": user["_id"], "date": {"$gte": week_ago, "$lte": today}
+    }).sort("date", -1).to_list(length=7)
+    return prediction, symptoms, calculate_cycle_stats(cycles)
+
+
+async def seed(db, n_cycles):
+    now = datetime.utcnow()
+    result = await db.users.insert_one({"name": "Bench", "email": f"bench-{now.timestamp()}@example.com", "created_at": now})
+    user = await db.users.find_one({"_id": result.inserted_id})
+    start = now - timedelta(days=28 * n_cycles)
+    await db.cycles.insert_many([{
+        "user_id": user["_id"],
+        "start_date": (start + timedelta(days=28 * i)).strftime("%Y-%m-%d"),
+        "end_date": (start + timedelta(days=28 * i + 4)).strftime("%Y-%m-%d"),
+        "flow_level": "medium", "created_at": now,
+    } for i in range(n_cycles)])
+    await db.symptoms.insert_many([{
+        "user_id": user["_id"], "date": (now - timedelta(days=i)).strftime("%Y-%m-%d"),
+        "cramps": 1, "created_at": now,
+    } for i in range(7)])
+    return user
+
+
+async def timed(fn, user_id, iterations):
+    samples = []
+    for _ in range(iterations):
+        await prediction_cache.prediction_cache.delete(f"prediction:{user_id}")
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+async def run(n_cycles, latency_ms, iterations):
+    await connect_db()
+    raw_db = database.get_db()
+    user = await seed(raw_db, n_cycles)
+    user_id = user["_id"]
+    db = DelayedDatabase(raw_db, latency_ms / 1000) if latency_ms else raw_db
+    database.db = db
+
+    serial = await timed(lambda: serial_dashboard(db, user), user_id, iterations)
+    concurrent = await timed(lambda: get_dashboard_data(current_user=user), user_id, iterations)
+
+    database.db = raw_db
+    await raw_db.users.delete_one({"_id": user_id})
+    await raw_db.cycles.delete_many({"user_id": user_id})
+    await raw_db.symptoms.delete_many({"user_id": user_id})
+    await close_db()
+
+    print(f"{n_cycles} cycles, +{latency_ms}ms per round trip, cold prediction cache")
+    print(f"serial      p50 {serial[0]:7.2f}ms  p95 {serial[1]:7.2f}ms")
+    print(f"concurrent  p50 {concurrent[0]:7.2f}ms  p95 {concurrent[1]:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.cycles, args.latency_ms, args.iterations))
@@ -0,0 +1,89 @@
+"""Per-row serialization cost of list responses, before and after the fast path.
+
+"before" reproduces what FastAPI did for the old handlers: build one Pydantic
+model per row, re-validate the list against response_model, dump it and
+json-encode it. "after" builds plain dicts and encodes them with orjson.
+
+    python -m scripts.bench_serialization --rows 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+import orjson
+from bson import ObjectId
+from pydantic import TypeAdapter
+from models.cycle import CycleResponse
+from models.symptom import SymptomResponse
+from routers.cycles import cycle_to_dict, cycle_to_response
+from routers.symptoms import symptom_to_dict, symptom_to_response
+
+
+def make_cycles(n):
+    user_id = ObjectId()
+    start = datetime(2000, 1, 1)
+    docs = []
+    for i in range(n):
+        s = start + timedelta(days=28 * i)
+        docs.append({
+            "_id": ObjectId(), "user_id": user_id,
+            "start_date": s.strftime("%Y-%m-%d"),
+            "end_date": (s + timedelta(days=4)).strftime("%Y-%m-%d"),
+            "flow_level": "medium", "notes": "note " * 5, "created_at": s,
+        })
+    return docs
+
+
+def make_symptoms(n):
+    user_id = ObjectId()
+    start = datetime(2000, 1, 1)
+    return [{
+        "_id": ObjectId(), "user_id": user_id,
+        "date": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+        "cramps": i % 4, "bloating": 1, "headache": 0, "backache": 2,
+        "mood": "calm", "energy": "medium", "breast_tenderness": False,
+        "acne": True, "nausea": False, "discharge": None, "notes": None,
+        "created_at": start + timedelta(days=i),
+    } for i in range(n)]
+
+
+def before(docs, to_response, adapter):
+    models = [to_response(d) for d in docs]
+    validated = adapter.validate_python(models, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def after(docs, to_dict):
+    return orjson.dumps([to_dict(d) for d in docs])
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(rows: int, repeat: int):
+    cases = [
+        ("cycles", make_cycles(rows), cycle_to_response, cycle_to_dict, List[CycleResponse]),
+        ("symptoms", make_symptoms(rows), symptom_to_response, symptom_to_dict, List[SymptomResponse]),
+    ]
+    for name, docs, to_response, to_dict, model in cases:
+        adapter = TypeAdapter(model)
+        assert json.loads(before(docs, to_response, adapter)) == json.loads(after(docs, to_dict))
+        slow = timed(lambda: before(docs, to_response, adapter), repeat)
+        fast = timed(lambda: after(docs, to_dict), repeat)
+        print(f"{name:<9} {rows} rows  before {slow * 1e6 / rows:6.2f}us/row  "
+              f"after {fast * 1e6 / rows:6.2f}us/row  ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,109 @@
+"""Throughput scaling of serve.py with the number of workers.
+
+For each worker count, starts `python serve.py` on a local port, drives it
+over real TCP from several client processes (so the load generator is not
+the bottleneck) for --duration seconds, then stops it with SIGTERM, which
+also exercises the graceful drain. Reports req/s and latency per setting.
+Pass --token to hit authenticated routes such as /predictions.
+
+    python -m scripts.bench_workers --workers 1 2 4 8 --path /predictions --token <jwt>
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+import httpx
+from scripts.login_burst import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def wait_until_ready(url: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+async def drive(url: str, headers: dict, concurrency: int, duration: float):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, headers=headers, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                res = await client.get(url)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += res.status_code >= 400
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def client_process(url, headers, concurrency, duration, results):
+    results.put(asyncio.run(drive(url, headers, concurrency, duration)))
+
+
+def measure(workers: int, args) -> None:
+    env = dict(os.environ, SERVER_WORKERS=str(workers), SERVER_PORT=str(args.port),
+               SERVER_HOST="127.0.0.1")
+    server = subprocess.Popen([sys.executable, "serve.py"], cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        if not wait_until_ready(base + "/", 60):
+            print(f"{workers:>7}  server did not start")
+            return
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(
+                target=client_process,
+                args=(base + args.path, headers, args.concurrency, args.duration, results),
+            )
+            for _ in range(args.clients)
+        ]
+        for client in clients:
+            client.start()
+        latencies, errors = [], 0
+        for _ in clients:
+            samples, failed = results.get()
+            latencies += samples
+            errors += failed
+        for client in clients:
+            client.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+    print(f"{workers:>7} {len(latencies) / args.duration:>9.0f} {percentile(latencies, 50):>8.1f}ms "
+          f"{percentile(latencies, 99):>8.1f}ms {errors:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/")
+    parser.add_argument("--token", default="")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per client")
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPUs, GET {args.path}")
+    print(f"{'workers':>7} {'req/s':>9} {'p50':>10} {'p99':>10} {'errors':>7}")
+    for count in args.workers:
+        measure(count, args)
@@ -0,0 +1,25 @@
+"""Ensure indexes, then fail if any router query plans to a COLLSCAN.
+
+    python -m scripts.check_query_plans
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import settings
+from services.index_service import ensure_indexes, verify_query_plans
+
+
+async def main():
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.db_name]
+    try:
+        conflicts = await ensure_indexes(db)
+        if conflicts:
+            print(f"Unique indexes not built (run scripts.dedupe_unique_keys): {', '.join(conflicts)}")
+        await verify_query_plans(db)
+        print("All router queries are index-backed")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
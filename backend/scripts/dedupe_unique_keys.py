@@ -0,0 +1,71 @@
+"""Remove documents that block the declared unique indexes, then build them.
+
+Data written before the unique indexes existed (check-then-insert upserts,
+concurrent cycle imports) can hold several documents per key. For each key
+the most recently created document is kept; users who lose cycles get their
+cycle_stats rebuilt. Duplicate user emails are only reported: merging
+accounts needs a person.
+
+    python -m scripts.dedupe_unique_keys          # report only
+    python -m scripts.dedupe_unique_keys --apply  # delete duplicates, build indexes
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import settings
+from services.cycle_stats_service import cycle_stats_lock, rebuild_cycle_stats
+from services.index_service import ensure_indexes, unique_keys
+
+REPORT_ONLY = {"users"}
+
+
+def duplicates_pipeline(fields):
+    return [
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$group": {
+            "_id": {field: f"${field}" for field in fields},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+
+
+async def dedupe(db, collection: str, name: str, fields, apply: bool) -> None:
+    keys = removed = 0
+    users = set()
+    cursor = db[collection].aggregate(duplicates_pipeline(fields), allowDiskUse=True)
+    async for group in cursor:
+        keys += 1
+        extra = group["ids"][1:]
+        if apply and collection not in REPORT_ONLY:
+            result = await db[collection].delete_many({"_id": {"$in": extra}})
+            removed += result.deleted_count
+            users.add(group["_id"].get("user_id"))
+    if collection == "cycles":
+        for user_id in users:
+            async with cycle_stats_lock(db, user_id):
+                await rebuild_cycle_stats(db, user_id)
+            await db.users.update_one({"_id": user_id}, {"$inc": {"cycles_version": 1}})
+    action = f"removed {removed} document(s)" if apply and collection not in REPORT_ONLY else "left in place"
+    print(f"{collection}.{name}: {keys} duplicated key(s), {action}")
+
+
+async def main(apply: bool):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.db_name]
+    try:
+        for collection, name, fields in unique_keys():
+            await dedupe(db, collection, name, fields, apply)
+        if apply:
+            conflicts = await ensure_indexes(db)
+            print(f"Still blocked: {', '.join(conflicts)}" if conflicts else "All indexes built")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="delete duplicates and build indexes")
+    args = parser.parse_args()
+    asyncio.run(main(args.apply))
@@ -0,0 +1,173 @@
+"""API load test for the hot request paths.
+
+Seeds synthetic users with randomized cycle and symptom histories, then runs
+--concurrency clients against /auth/login, /dashboard, /predictions, /cycles
+and /symptoms in-process over httpx's ASGI transport for --duration seconds,
+and reports throughput and p50/p95/p99 per endpoint. Seeded users are removed
+afterwards. --in-memory uses mongomock-motor (dev-only) instead of the
+MongoDB configured in .env. With --max-p95-ms the exit status is non-zero
+when any endpoint is slower or returned errors, so it can gate a change.
+
+    python -m scripts.load_test --users 50 --cycles 24 --concurrency 32 --duration 20
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+import httpx
+import database
+from config import settings
+from database import connect_db, close_db
+from main import app
+from scripts.login_burst import percentile
+from services.auth_service import create_access_token, hash_password
+from services.cycle_stats_service import rebuild_cycle_stats
+
+PASSWORD = "load-test-password"
+
+# (name, method, path, weight); login is weighted low since each one is a bcrypt
+WORKLOAD = (
+    ("dashboard", "GET", "/dashboard", 4),
+    ("predictions", "GET", "/predictions", 4),
+    ("cycles", "GET", "/cycles?limit=20", 2),
+    ("symptoms", "GET", "/symptoms?limit=30", 2),
+    ("login", "POST", "/auth/login", 1),
+)
+
+
+async def seed(db, n_users, n_cycles, rng):
+    """Insert users with irregular cycles and sparse symptom logs."""
+    run_id = uuid.uuid4().hex[:8]
+    password_hash = hash_password(PASSWORD)
+    now = datetime.utcnow()
+    users = []
+    for i in range(n_users):
+        email = f"load-{run_id}-{i}@example.com"
+        result = await db.users.insert_one({
+            "name": f"Load {i}", "email": email, "password_hash": password_hash,
+            "is_onboarded": True, "average_cycle_length": 28, "average_period_length": 5,
+            "created_at": now,
+        })
+        user_id = result.inserted_id
+
+        cycles = []
+        start = now - timedelta(days=29 * n_cycles)
+        for _ in range(n_cycles):
+            duration = rng.randint(3, 7)
+            cycles.append({
+                "user_id": user_id,
+                "start_date": start.strftime("%Y-%m-%d"),
+                "end_date": (start + timedelta(days=duration - 1)).strftime("%Y-%m-%d"),
+                "flow_level": rng.choice(["light", "medium", "heavy"]),
+                "created_at": now,
+            })
+            start += timedelta(days=rng.randint(24, 34))
+        if cycles:
+            await db.cycles.insert_many(cycles)
+
+        days = rng.sample(range(29 * n_cycles or 30), min(60, 29 * n_cycles or 30))
+        await db.symptoms.insert_many([{
+            "user_id": user_id,
+            "date": (now - timedelta(days=day)).strftime("%Y-%m-%d"),
+            "cramps": rng.randint(0, 3), "bloating": rng.randint(0, 3),
+            "mood": rng.choice(["happy", "calm", "irritable", None]),
+            "created_at": now,
+        } for day in days])
+        await rebuild_cycle_stats(db, user_id)
+
+        users.append({
+            "_id": user_id,
+            "email": email,
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+        })
+    return users
+
+
+async def cleanup(db, users):
+    ids = [user["_id"] for user in users]
+    await db.users.delete_many({"_id": {"$in": ids}})
+    await db.cycles.delete_many({"user_id": {"$in": ids}})
+    await db.symptoms.delete_many({"user_id": {"$in": ids}})
+
+
+async def worker(client, users, deadline, rng, samples, errors):
+    names = [w[0] for w in WORKLOAD]
+    weights = [w[3] for w in WORKLOAD]
+    requests = {w[0]: w[1:3] for w in WORKLOAD}
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        method, path = requests[name]
+        user = rng.choice(users)
+        started = time.perf_counter()
+        if method == "POST":
+            res = await client.post(path, json={"email": user["email"], "password": PASSWORD})
+        else:
+            res = await client.get(path, headers=user["headers"])
+        samples[name].append((time.perf_counter() - started) * 1000)
+        if res.status_code >= 400:
+            errors[name] += 1
+
+
+async def run(args) -> bool:
+    if args.in_memory:
+        from mongomock_motor import AsyncMongoMockClient
+
+        database.client = AsyncMongoMockClient()
+        database.db = database.client[settings.db_name]
+    else:
+        await connect_db()
+    db = database.get_db()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    users = await seed(db, args.users, args.cycles, rng)
+    print(f"Seeded {args.users} users x {args.cycles} cycles in {time.perf_counter() - started:.1f}s")
+
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            worker(client, users, deadline, random.Random(args.seed + i), samples, errors)
+            for i in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    await cleanup(db, users)
+    if not args.in_memory:
+        await close_db()
+
+    total = sum(len(s) for s in samples.values())
+    print(f"{total} requests in {elapsed:.1f}s with {args.concurrency} clients: {total / elapsed:.0f} req/s")
+    print(f"{'endpoint':<12} {'count':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    ok = True
+    for name, *_ in WORKLOAD:
+        if not samples[name]:
+            continue
+        p95 = percentile(samples[name], 95)
+        print(f"{name:<12} {len(samples[name]):>7} {len(samples[name]) / elapsed:>8.0f} "
+              f"{percentile(samples[name], 50):>7.1f}ms {p95:>7.1f}ms "
+              f"{percentile(samples[name], 99):>7.1f}ms {errors[name]:>7}")
+        if errors[name] or (args.max_p95_ms and name != "login" and p95 > args.max_p95_ms):
+            ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cycles", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--in-memory", action="store_true")
+    parser.add_argument("--max-p95-ms", type=float, default=0,
+                        help="fail if a read endpoint's p95 exceeds this (login excluded)")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
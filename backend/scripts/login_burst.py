@@ -0,0 +1,64 @@
+"""Login-burst load test.
+
+Fires a burst of concurrent /auth/login requests while a second group of
+clients keeps polling /predictions, then reports latency percentiles for the
+unrelated /predictions traffic. Runs in-process over httpx's ASGI transport
+against the MongoDB configured in .env.
+
+    python -m scripts.login_burst --logins 200 --pollers 20
+"""
+import argparse
+import asyncio
+import time
+import uuid
+import httpx
+from database import connect_db, close_db
+from main import app
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(logins: int, pollers: int):
+    await connect_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email = f"burst-{uuid.uuid4().hex[:8]}@example.com"
+        credentials = {"email": email, "password": "burst-password"}
+        res = await client.post("/auth/register", json={"name": "Burst", **credentials})
+        headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+        await client.post("/cycles", json={"start_date": "2024-01-01", "end_date": "2024-01-05"}, headers=headers)
+
+        latencies = []
+        done = asyncio.Event()
+
+        async def poll():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/predictions", headers=headers)
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0)
+
+        poll_tasks = [asyncio.create_task(poll()) for _ in range(pollers)]
+        started = time.perf_counter()
+        await asyncio.gather(*(client.post("/auth/login", json=credentials) for _ in range(logins)))
+        burst_seconds = time.perf_counter() - started
+        done.set()
+        await asyncio.gather(*poll_tasks)
+
+    await close_db()
+    print(f"{logins} logins in {burst_seconds:.2f}s")
+    print(f"/predictions during burst: n={len(latencies)} "
+          f"p50={percentile(latencies, 50):.1f}ms p99={percentile(latencies, 99):.1f}ms "
+          f"max={max(latencies):.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--pollers", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.pollers))
@@ -0,0 +1,34 @@
+"""Backfill or repair the cycle_stats aggregates on user documents.
+
+    python -m scripts.rebuild_cycle_stats              # every user
+    python -m scripts.rebuild_cycle_stats --user <id>  # one user
+"""
+import argparse
+import asyncio
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import settings
+from services.cycle_stats_service import cycle_stats_lock, rebuild_cycle_stats
+
+
+async def main(user_id=None):
+    client = AsyncIOMotorClient(settings.mongodb_uri)
+    db = client[settings.db_name]
+    try:
+        query = {"_id": ObjectId(user_id)} if user_id else {}
+        rebuilt = 0
+        async for user in db.users.find(query, {"_id": 1}):
+            async with cycle_stats_lock(db, user["_id"]):
+                await rebuild_cycle_stats(db, user["_id"])
+            await db.users.update_one({"_id": user["_id"]}, {"$inc": {"cycles_version": 1}})
+            rebuilt += 1
+        print(f"Rebuilt cycle stats for {rebuilt} user(s)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", help="only rebuild this user id")
+    args = parser.parse_args()
+    asyncio.run(main(args.user))
@@ -0,0 +1,158 @@
+"""Production server: N uvicorn workers sharing one listening socket.
+
+    python serve.py
+
+Workers are spawned processes, each with its own event loop (uvloop when
+installed), httptools parser and, through the app lifespan, its own Motor
+client. The supervisor:
+  - replaces a worker that exits, which is how request-budget recycling
+    works: a worker stops by itself after SERVER_MAX_REQUESTS (+ jitter);
+  - on SIGTERM/SIGINT forwards SIGTERM so every worker stops accepting,
+    finishes in-flight requests within SERVER_GRACEFUL_TIMEOUT_SECONDS, runs
+    its lifespan shutdown, and exits; stragglers are killed after that.
+
+For development keep using `uvicorn main:app --reload`.
+"""
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+import uvicorn
+from config import settings
+
+logger = logging.getLogger("mycare.server")
+
+multiprocessing.allow_connection_pickling()
+spawn = multiprocessing.get_context("spawn")
+
+
+def _event_loop() -> str:
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
+
+
+def worker_options() -> dict:
+    options = {
+        "loop": _event_loop(),
+        "http": "httptools",
+        "lifespan": "on",
+        "timeout_graceful_shutdown": settings.server_graceful_timeout_seconds,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.server_forwarded_allow_ips,
+        "access_log": settings.server_access_log,
+    }
+    if settings.server_max_requests:
+        # Jitter so workers started together do not all recycle at once
+        options["limit_max_requests"] = settings.server_max_requests + random.randint(
+            0, settings.server_max_requests_jitter
+        )
+    return options
+
+
+# Exit code of a worker whose lifespan startup failed (e.g. MongoDB unreachable)
+STARTUP_FAILURE = 3
+
+
+class WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, booted):
+        super().__init__(config)
+        self.booted = booted
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.booted.set()
+
+    @property
+    def startup_failed(self) -> bool:
+        # Not merely "never started": a SIGTERM during startup is a clean exit
+        lifespan = getattr(self, "lifespan", None)
+        return not self.started and (
+            getattr(lifespan, "startup_failed", False)
+            or getattr(lifespan, "error_occured", False)
+        )
+
+
+def run_worker(sock, options: dict, booted) -> None:
+    server = WorkerServer(uvicorn.Config("main:app", **options), booted)
+    server.run(sockets=[sock])
+    if server.startup_failed:
+        sys.exit(STARTUP_FAILURE)
+
+
+class Supervisor:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.processes = []
+        self.should_exit = False
+        self.exit_code = 0
+        self.recycled = 0
+        # Set once any worker has started; after that a failed startup is
+        # treated as transient (e.g. MongoDB briefly down during a recycle)
+        self.booted = spawn.Event()
+        self.sock = uvicorn.Config(
+            "main:app", host=settings.server_host, port=settings.server_port
+        ).bind_socket()
+
+    def _spawn(self):
+        process = spawn.Process(
+            target=run_worker, args=(self.sock, worker_options(), self.booted)
+        )
+        process.start()
+        return process
+
+    def _handle_signal(self, signum, frame) -> None:
+        self.should_exit = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        logger.info(
+            "Starting %d workers on %s:%d (loop=%s)",
+            self.workers, settings.server_host, settings.server_port, _event_loop(),
+        )
+        self.processes = [self._spawn() for _ in range(self.workers)]
+
+        while not self.should_exit:
+            for i, process in enumerate(self.processes):
+                if process.exitcode == STARTUP_FAILURE and not self.booted.is_set():
+                    # Broken from the start: respawning would only crash-loop
+                    logger.error("Worker %s failed to start; shutting down", process.pid)
+                    self.should_exit = True
+                    self.exit_code = STARTUP_FAILURE
+                    break
+                if not process.is_alive() and not self.should_exit:
+                    logger.info("Worker %s exited (code %s); starting a replacement",
+                                process.pid, process.exitcode)
+                    self.recycled += 1
+                    self.processes[i] = self._spawn()
+            time.sleep(0.5)
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        logger.info("Draining %d workers", len(self.processes))
+        for process in self.processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        deadline = time.monotonic() + settings.server_graceful_timeout_seconds + 5
+        for process in self.processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker %s did not drain in time; killing it", process.pid)
+                process.kill()
+                process.join()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    supervisor = Supervisor(settings.server_workers or os.cpu_count() or 1)
+    supervisor.run()
+    sys.exit(supervisor.exit_code)
@@ -1,11 +1,28 @@
+import asyncio
+import uuid
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# "typ" claim of claims-mode tokens; legacy tokens carry only "sub" and "exp"
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+# bcrypt runs off the event loop in a bounded pool; the semaphore caps how
+# many hashes are in the pool at once and the rest wait in `queued`. A
+# semaphore binds to the loop it first waits on, so there is one per loop.
+_hash_executor: Optional[Executor] = None
+_hash_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+hash_pool_stats = {"queued": 0, "in_flight": 0, "completed": 0, "max_queued": 0}
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -15,6 +32,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        workers = settings.password_hash_workers
+        if settings.password_hash_executor == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="bcrypt"
+            )
+    return _hash_executor
+
+
+def _get_hash_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _hash_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _hash_semaphores[loop] = asyncio.Semaphore(
+            settings.password_hash_concurrency
+        )
+    return semaphore
+
+
+async def _run_in_hash_pool(fn, *args):
+    semaphore = _get_hash_semaphore()
+    hash_pool_stats["queued"] += 1
+    hash_pool_stats["max_queued"] = max(
+        hash_pool_stats["max_queued"], hash_pool_stats["queued"]
+    )
+    try:
+        await semaphore.acquire()
+    finally:
+        hash_pool_stats["queued"] -= 1
+    hash_pool_stats["in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        hash_pool_stats["in_flight"] -= 1
+        hash_pool_stats["completed"] += 1
+        semaphore.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (
@@ -24,6 +98,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
+def create_claims_tokens(user_id, token_version: int) -> Tuple[str, str]:
+    """Short-lived access token and refresh token bound to the user's token_version."""
+    claims = {"sub": str(user_id), "ver": token_version}
+    access = create_access_token(
+        {**claims, "typ": ACCESS_TOKEN},
+        timedelta(minutes=settings.claims_access_token_expire_minutes),
+    )
+    # jti makes each refresh token single-use (see routers/auth.refresh_tokens)
+    refresh = create_access_token(
+        {**claims, "typ": REFRESH_TOKEN, "jti": uuid.uuid4().hex},
+        timedelta(minutes=settings.refresh_token_expire_minutes),
+    )
+    return access, refresh
+
+
 def decode_access_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(
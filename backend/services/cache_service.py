@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from config import settings
+
+
+class CacheBackend:
+    """Async key/value store interface used by the in-process caches.
+
+    Swap in a shared store (e.g. Redis) by implementing these methods.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class TTLCache(CacheBackend):
+    """Bounded in-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Authenticated user documents keyed by user id, and decoded JWT payloads
+# keyed by a hash of the raw token. Both are read by get_current_user.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+
+async def invalidate_user(user_id) -> None:
+    """Drop the cached user document after a write to it."""
+    await user_cache.delete(str(user_id))
+
+
+async def bump_user_version(db, user_id, field: str) -> None:
+    """Increment one of the user's write-version counters (used in ETags)."""
+    await db.users.update_one({"_id": user_id}, {"$inc": {field: 1}})
+    await invalidate_user(user_id)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from services import insights_service, prediction_cache
+from services.cache_service import user_cache
+
+logger = logging.getLogger("mycare.changes")
+
+WATCHED_COLLECTIONS = ("users", "cycles", "symptoms")
+
+# Server error codes: change streams unsupported (standalone server), and a
+# resume token that has fallen off the oplog.
+NOT_REPLICA_SET = 40573
+HISTORY_LOST = 286
+
+
+def change_pipeline():
+    return [
+        {"$match": {"ns.coll": {"$in": list(WATCHED_COLLECTIONS)}}},
+        # Inserts and replaces carry the document; only the owner is needed
+        {"$project": {
+            "operationType": 1, "ns": 1, "documentKey": 1, "fullDocument.user_id": 1,
+        }},
+    ]
+
+
+def affected_user(change: Dict[str, Any]) -> Optional[Any]:
+    """The user whose cached state a change makes stale, if it can be told.
+
+    Every cycle and symptom write also bumps a version on the user document,
+    so deletes and partial updates (which carry no user_id) are still seen
+    through the users event that follows them.
+    """
+    collection = change.get("ns", {}).get("coll")
+    if collection == "users":
+        return change.get("documentKey", {}).get("_id")
+    return (change.get("fullDocument") or {}).get("user_id")
+
+
+async def invalidate_user_caches(user_id) -> None:
+    await user_cache.delete(str(user_id))
+    await prediction_cache.prediction_cache.delete(prediction_cache._cache_key(user_id))
+    await insights_service.insights_cache.delete(insights_service._cache_key(user_id))
+
+
+def _clear_all_caches() -> None:
+    for cache in (user_cache, prediction_cache.prediction_cache, insights_service.insights_cache):
+        if hasattr(cache, "clear"):
+            cache.clear()
+
+
+class ChangeWatcher:
+    """Tails one change stream over the watched collections in this worker.
+
+    Each worker runs its own watcher, so a write handled anywhere evicts the
+    affected user from every worker's in-process caches. A new worker starts
+    with empty caches, so it watches from "now"; the resume token is only
+    kept in memory to bridge reconnects. If it has fallen off the oplog, all
+    caches are cleared instead, since events were missed.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._task: Optional[asyncio.Task] = None
+        self._token = None
+        self.stats = {"events": 0, "invalidations": 0, "restarts": 0, "running": False}
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                await self._watch()
+                # Stream closed normally (e.g. an invalidate event)
+                delay = 1
+            except OperationFailure as exc:
+                if exc.code == NOT_REPLICA_SET:
+                    logger.warning("Change streams need a replica set; cache watcher disabled")
+                    return
+                if exc.code == HISTORY_LOST:
+                    logger.warning("Resume token expired; clearing caches and starting fresh")
+                    self._token = None
+                    _clear_all_caches()
+                else:
+                    logger.exception("Change stream failed")
+            except PyMongoError:
+                logger.exception("Change stream failed")
+            self.stats["running"] = False
+            self.stats["restarts"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _watch(self) -> None:
+        async with self.db.watch(
+            change_pipeline(), start_after=self._token, max_await_time_ms=1000
+        ) as stream:
+            self.stats["running"] = True
+            while stream.alive:
+                change = await stream.try_next()
+                # Advances on idle batches too, so a reconnect resumes close by
+                self._token = stream.resume_token
+                if change is not None:
+                    self.stats["events"] += 1
+                    user_id = affected_user(change)
+                    if user_id is not None:
+                        await invalidate_user_caches(user_id)
+                        self.stats["invalidations"] += 1
+
+
+watcher: Optional[ChangeWatcher] = None
+
+
+async def start_change_watcher(db) -> None:
+    global watcher
+    watcher = ChangeWatcher(db)
+    await watcher.start()
+
+
+async def stop_change_watcher() -> None:
+    global watcher
+    if watcher:
+        await watcher.stop()
+        watcher = None
@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Run at most one computation per key; concurrent callers share its result.
+
+    The computation runs in its own task, so a caller that disconnects does
+    not cancel it for the others still waiting.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"calls": 0, "shared": 0, "in_flight": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self.stats["in_flight"] = len(self._inflight)
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        self.stats["in_flight"] = len(self._inflight)
+
+
+# Shared by the expensive per-user reads (/dashboard, /predictions). Keys
+# include the user's data versions so a request made after a write never
+# joins a computation that started before it.
+read_flight = SingleFlight()
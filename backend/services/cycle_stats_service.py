@@ -0,0 +1,187 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from services.prediction_service import to_ordinal
+
+# Running aggregates kept on the user document under "cycle_stats". Gaps and
+# durations only count when they pass the same validity ranges that
+# calculate_cycle_stats applies, so averages derived from these sums match a
+# full recomputation over the whole history.
+EMPTY_CYCLE_STATS = {
+    "count": 0,
+    "gap_count": 0,
+    "gap_sum": 0,
+    "gap_sumsq": 0,
+    "duration_count": 0,
+    "duration_sum": 0,
+    "duration_sumsq": 0,
+    # "last_start" (latest start_date) is absent until the first cycle
+}
+
+
+def valid_gap(prev: Optional[dict], cycle: Optional[dict]) -> Optional[int]:
+    if prev is None or cycle is None:
+        return None
+    prev_start = to_ordinal(prev["start_date"])
+    start = to_ordinal(cycle["start_date"])
+    if prev_start is None or start is None:
+        return None
+    gap = start - prev_start
+    return gap if 15 <= gap <= 60 else None
+
+
+def valid_duration(cycle: dict) -> Optional[int]:
+    if not cycle.get("end_date"):
+        return None
+    start = to_ordinal(cycle["start_date"])
+    end = to_ordinal(cycle["end_date"])
+    if start is None or end is None:
+        return None
+    duration = end - start + 1
+    return duration if 1 <= duration <= 14 else None
+
+
+class _Delta:
+    def __init__(self):
+        self.inc: Dict[str, int] = {}
+
+    def add(self, kind: str, value: Optional[int], sign: int) -> None:
+        if value is None:
+            return
+        for field, amount in (("count", 1), ("sum", value), ("sumsq", value * value)):
+            key = f"cycle_stats.{kind}_{field}"
+            self.inc[key] = self.inc.get(key, 0) + sign * amount
+
+
+# Per-user lease serializing cycle inserts/deletes with their cycle_stats
+# update. The deltas below are computed from the neighbouring cycles, so two
+# writes for one user interleaving between their cycle write and their stats
+# update would count a gap twice or miss it.
+LOCK_FIELD = "cycle_stats_lock"
+LOCK_LEASE_SECONDS = 10
+
+
+class CycleStatsLock:
+    def __init__(self, user_id, token: ObjectId):
+        self.user_id = user_id
+        self.token = token
+
+    @property
+    def held(self) -> Dict[str, Any]:
+        """Filter matching the user document only while this lease is held."""
+        return {"_id": self.user_id, f"{LOCK_FIELD}.token": self.token}
+
+
+@asynccontextmanager
+async def cycle_stats_lock(db, user_id):
+    """Hold the user's cycle_stats lease; apply the stats update with `held`.
+
+    A lease left by a crashed request expires after LOCK_LEASE_SECONDS. An
+    update filtered on `held` then no longer matches, and the caller rebuilds
+    instead of applying a delta.
+    """
+    lock = CycleStatsLock(user_id, ObjectId())
+    deadline = asyncio.get_running_loop().time() + 2 * LOCK_LEASE_SECONDS
+    while True:
+        now = datetime.utcnow()
+        result = await db.users.update_one(
+            {"_id": user_id, "$or": [
+                {LOCK_FIELD: {"$exists": False}},
+                {f"{LOCK_FIELD}.expires_at": {"$lt": now}},
+            ]},
+            {"$set": {LOCK_FIELD: {
+                "token": lock.token,
+                "expires_at": now + timedelta(seconds=LOCK_LEASE_SECONDS),
+            }}},
+        )
+        if result.matched_count:
+            break
+        if asyncio.get_running_loop().time() > deadline:
+            raise TimeoutError(f"cycle_stats lock for user {user_id} not acquired")
+        await asyncio.sleep(0.01 + random.random() * 0.04)
+    try:
+        yield lock
+    finally:
+        await db.users.update_one(lock.held, {"$unset": {LOCK_FIELD: ""}})
+
+
+async def _neighbours(db, cycle: dict):
+    """The cycles immediately before and after `cycle` in (start_date, _id) order."""
+    user_id, start_date, cycle_id = cycle["user_id"], cycle["start_date"], cycle["_id"]
+    prev = await db.cycles.find_one(
+        {"user_id": user_id, "$or": [
+            {"start_date": {"$lt": start_date}},
+            {"start_date": start_date, "_id": {"$lt": cycle_id}},
+        ]},
+        {"start_date": 1},
+        sort=[("start_date", -1), ("_id", -1)],
+    )
+    nxt = await db.cycles.find_one(
+        {"user_id": user_id, "$or": [
+            {"start_date": {"$gt": start_date}},
+            {"start_date": start_date, "_id": {"$gt": cycle_id}},
+        ]},
+        {"start_date": 1},
+        sort=[("start_date", 1), ("_id", 1)],
+    )
+    return prev, nxt
+
+
+async def cycle_inserted_update(db, cycle: dict) -> Dict[str, Any]:
+    """Update document applying a newly inserted cycle to the aggregates."""
+    prev, nxt = await _neighbours(db, cycle)
+    delta = _Delta()
+    delta.add("gap", valid_gap(prev, nxt), -1)
+    delta.add("gap", valid_gap(prev, cycle), 1)
+    delta.add("gap", valid_gap(cycle, nxt), 1)
+    delta.add("duration", valid_duration(cycle), 1)
+    delta.inc["cycle_stats.count"] = 1
+    return {"$inc": delta.inc, "$max": {"cycle_stats.last_start": cycle["start_date"]}}
+
+
+async def cycle_deleted_update(db, cycle: dict) -> Dict[str, Any]:
+    """Update document removing an already deleted cycle from the aggregates."""
+    prev, nxt = await _neighbours(db, cycle)
+    delta = _Delta()
+    delta.add("gap", valid_gap(prev, cycle), -1)
+    delta.add("gap", valid_gap(cycle, nxt), -1)
+    delta.add("gap", valid_gap(prev, nxt), 1)
+    delta.add("duration", valid_duration(cycle), -1)
+    delta.inc["cycle_stats.count"] = -1
+    latest = await db.cycles.find_one(
+        {"user_id": cycle["user_id"]}, {"start_date": 1}, sort=[("start_date", -1)]
+    )
+    if latest is None:
+        return {"$inc": delta.inc, "$unset": {"cycle_stats.last_start": ""}}
+    return {"$inc": delta.inc, "$set": {"cycle_stats.last_start": latest["start_date"]}}
+
+
+def cycle_updated_update(before: dict, after: dict) -> Dict[str, Any]:
+    """Update document for an edit; only end_date (and so duration) can change."""
+    delta = _Delta()
+    delta.add("duration", valid_duration(before), -1)
+    delta.add("duration", valid_duration(after), 1)
+    return {"$inc": delta.inc}
+
+
+async def rebuild_cycle_stats(db, user_id) -> Dict[str, Any]:
+    """Recompute a user's aggregates from the raw cycles collection."""
+    stats = dict(EMPTY_CYCLE_STATS)
+    delta = _Delta()
+    prev = None
+    cursor = db.cycles.find(
+        {"user_id": user_id}, {"start_date": 1, "end_date": 1}
+    ).sort([("start_date", 1), ("_id", 1)])
+    async for cycle in cursor:
+        stats["count"] += 1
+        delta.add("gap", valid_gap(prev, cycle), 1)
+        delta.add("duration", valid_duration(cycle), 1)
+        stats["last_start"] = cycle["start_date"]
+        prev = cycle
+    for key, value in delta.inc.items():
+        stats[key.split(".", 1)[1]] = value
+    await db.users.update_one({"_id": user_id}, {"$set": {"cycle_stats": stats}})
+    return stats
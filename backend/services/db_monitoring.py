@@ -0,0 +1,114 @@
+import threading
+from pymongo import monitoring
+from services.metrics_service import current_request
+
+
+class DbMetrics:
+    """Command latency and connection-pool counters fed by pymongo listeners.
+
+    Listeners run on driver threads, so updates go through a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = {}
+        self.pool = {
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "checked_out": 0,
+            "wait_total_ms": 0.0,
+            "wait_max_ms": 0.0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "pool_cleared": 0,
+        }
+
+    def record_command(self, name: str, duration_ms: float, failed: bool) -> None:
+        with self._lock:
+            entry = self.commands.get(name)
+            if entry is None:
+                entry = self.commands[name] = {
+                    "count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0,
+                }
+            entry["count"] += 1
+            entry["failures"] += int(failed)
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+
+    def record_pool(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self.pool[field] += amount
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.pool["checkouts"] += 1
+            self.pool["checked_out"] += 1
+            self.pool["wait_total_ms"] += wait_ms
+            self.pool["wait_max_ms"] = max(self.pool["wait_max_ms"], wait_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "commands": {name: dict(entry) for name, entry in self.commands.items()},
+                "pool": dict(self.pool),
+            }
+
+
+db_metrics = DbMetrics()
+
+
+def _record_for_request(duration_micros: int) -> None:
+    # Motor runs driver calls with a copy of the caller's context, so the
+    # request accumulator set by MetricsMiddleware is visible here.
+    request = current_request.get()
+    if request is not None:
+        request.db_calls += 1
+        request.db_seconds += duration_micros / 1_000_000
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        db_metrics.record_command(event.command_name, event.duration_micros / 1000, False)
+        _record_for_request(event.duration_micros)
+
+    def failed(self, event):
+        db_metrics.record_command(event.command_name, event.duration_micros / 1000, True)
+        _record_for_request(event.duration_micros)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        db_metrics.record_pool("pool_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        db_metrics.record_pool("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        db_metrics.record_pool("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        db_metrics.record_pool("checkout_failures")
+
+    def connection_checked_out(self, event):
+        db_metrics.record_checkout((event.duration or 0) * 1000)
+
+    def connection_checked_in(self, event):
+        db_metrics.record_pool("checked_out", -1)
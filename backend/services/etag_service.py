@@ -0,0 +1,43 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import Response
+
+# Part of every ETag; bump when a response shape changes so clients holding
+# an old body do not get a 304 for it.
+ETAG_SCHEMA = 1
+
+# Per-user data: shared caches must not store it, and clients revalidate
+# on every use (cheap, thanks to the 304).
+CACHE_CONTROL = "private, no-cache"
+
+
+def user_etag(user: Dict[str, Any], *parts: Any, dated: bool = False) -> str:
+    """Weak ETag from the user's write-version counters; no data is read.
+
+    `dated` adds the UTC date for responses derived from predictions, which
+    change at day rollover without any write.
+    """
+    values = [ETAG_SCHEMA, user["_id"], *parts]
+    if dated:
+        values.append(datetime.utcnow().strftime("%Y-%m-%d"))
+    digest = hashlib.blake2b("|".join(map(str, values)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
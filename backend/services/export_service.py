@@ -0,0 +1,75 @@
+import csv
+import io
+import zipfile
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+import orjson
+
+# Bytes of compressed output collected before yielding to the response
+ZIP_CHUNK_BYTES = 64 * 1024
+
+
+class _ZipSink:
+    """Write-only file object for ZipFile; without seek/tell, zipfile writes
+    data descriptors and never needs to go back over what was produced."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        self.size = 0
+        return data
+
+
+# (file name in the archive, column names, rows as dicts)
+Table = Tuple[str, Sequence[str], AsyncIterator[Dict[str, Any]]]
+
+
+async def ndjson_export(sections: Sequence[Tuple[str, AsyncIterator[Dict[str, Any]]]]) -> AsyncIterator[bytes]:
+    """One {"type", "data"} line per record, section after section."""
+    for kind, rows in sections:
+        async for row in rows:
+            yield orjson.dumps({"type": kind, "data": row}) + b"\n"
+
+
+async def zip_csv_export(tables: Sequence[Table]) -> AsyncIterator[bytes]:
+    """Stream a zip of CSV files, compressing rows as they are produced."""
+    sink = _ZipSink()
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def encode_row(values) -> bytes:
+        line.seek(0)
+        line.truncate()
+        writer.writerow(values)
+        return line.getvalue().encode()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, columns, rows in tables:
+            with archive.open(name, mode="w", force_zip64=True) as entry:
+                entry.write(encode_row(columns))
+                async for row in rows:
+                    entry.write(encode_row([_cell(row.get(column)) for column in columns]))
+                    if sink.size >= ZIP_CHUNK_BYTES:
+                        yield sink.drain()
+            yield sink.drain()
+    # Central directory, written when the archive closes
+    yield sink.drain()
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
@@ -0,0 +1,181 @@
+import csv
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+import orjson
+from pydantic import BaseModel, ValidationError
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+from services.prediction_service import format_ordinal, to_ordinal
+
+MAX_LINE_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """The rest of the body cannot be read (oversized line, bad encoding)."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines, holding at most one partial line."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        if len(pending) > MAX_LINE_BYTES:
+            raise ImportFormatError(f"Line longer than {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            yield _decode(line)
+    if pending:
+        yield _decode(pending)
+
+
+def _decode(line: bytes) -> str:
+    try:
+        return line.rstrip(b"\r").decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFormatError("Body is not UTF-8")
+
+
+def _csv_fields(line: str) -> List[str]:
+    # One physical line per record; quoted fields may contain commas but not newlines
+    return next(csv.reader([line]))
+
+
+async def iter_records(
+    lines: AsyncIterator[str], fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (row number, record or None, parse error or None) per non-empty line."""
+    header: Optional[List[str]] = None
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip() for name in _csv_fields(line)]
+            continue
+        row += 1
+        try:
+            if fmt == "csv":
+                values = _csv_fields(line)
+                if len(values) > len(header):
+                    raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+                # Empty cells fall back to the model defaults
+                record = {k: v for k, v in zip(header, values) if v != ""}
+            else:
+                record = orjson.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+        except (ValueError, csv.Error) as exc:
+            yield row, None, f"Unreadable row: {exc}"
+            continue
+        yield row, record, None
+
+
+def validate_record(model: Type[BaseModel], date_fields: Tuple[str, ...], record: Dict[str, Any]):
+    """Model instance, or an error string for the row."""
+    try:
+        entry = model.model_validate(record)
+    except ValidationError as exc:
+        first = exc.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        return None, f"{location}: {first['msg']}"
+    for field in date_fields:
+        value = getattr(entry, field)
+        # Dates are compared and indexed as strings, so only the zero-padded
+        # form is accepted ("2024-1-5" would sort after "2024-10-01")
+        ordinal = to_ordinal(value) if value is not None else None
+        if value is not None and (ordinal is None or format_ordinal(ordinal) != value):
+            return None, f"{field}: expected a YYYY-MM-DD date"
+    return entry, None
+
+
+class ImportWriter:
+    """Buffers upserts keyed by (user_id, date) and flushes them in chunks.
+
+    Within a chunk the last row for a date wins; across chunks the later
+    upsert replaces the earlier one, so the outcome is the same.
+    """
+
+    def __init__(self, collection, user_id, key_field: str, batch_size: int):
+        self.collection = collection
+        self.user_id = user_id
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self._pending: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self.received = 0
+        self.upserted = 0
+        self.updated = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    async def add(self, row: int, doc: Dict[str, Any]) -> None:
+        doc["user_id"] = self.user_id
+        if doc[self.key_field] in self._pending:
+            self.duplicates += 1
+        self._pending[doc[self.key_field]] = (row, doc)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        rows = []
+        operations = []
+        for key, (row, doc) in self._pending.items():
+            rows.append(row)
+            operations.append(
+                ReplaceOne({"user_id": self.user_id, self.key_field: key}, doc, upsert=True)
+            )
+        self._pending = {}
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            self.upserted += result.upserted_count
+            self.updated += result.matched_count
+        except BulkWriteError as exc:
+            details = exc.details
+            self.upserted += details.get("nUpserted", 0)
+            self.updated += details.get("nMatched", 0)
+            for write_error in details.get("writeErrors", []):
+                self.error(rows[write_error["index"]], write_error.get("errmsg", "Write failed"))
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "upserted": self.upserted,
+            "updated": self.updated,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+async def import_rows(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    writer: ImportWriter,
+    model: Type[BaseModel],
+    date_fields: Tuple[str, ...],
+    to_doc,
+) -> Dict[str, Any]:
+    """Stream, validate and write rows; memory is bounded by one batch."""
+    now = datetime.utcnow()
+    try:
+        async for row, record, problem in iter_records(iter_lines(chunks), fmt):
+            writer.received += 1
+            if problem is None:
+                entry, problem = validate_record(model, date_fields, record)
+            if problem is not None:
+                writer.error(row, problem)
+                continue
+            await writer.add(row, to_doc(entry, now))
+    except ImportFormatError as exc:
+        # Rows already read are still written; the rest of the body is skipped
+        writer.error(writer.received + 1, str(exc))
+    await writer.flush()
+    return writer.result()
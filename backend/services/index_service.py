@@ -0,0 +1,150 @@
+import logging
+from typing import Any, Dict, List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("mycare.indexes")
+
+DUPLICATE_KEY = 11000
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "cycles": [
+        IndexModel(
+            [("user_id", ASCENDING), ("start_date", ASCENDING), ("_id", ASCENDING)],
+            name="user_start_date_id",
+        ),
+        # One cycle per start date, so concurrent imports and logs cannot
+        # both insert it
+        IndexModel([("user_id", ASCENDING), ("start_date", ASCENDING)], unique=True, name="user_start_date_unique"),
+    ],
+    "symptoms": [
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], unique=True, name="user_date_unique"),
+    ],
+    "refresh_tokens_used": [
+        # Spent refresh token ids are only needed until the token expires
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "reminders": [
+        IndexModel([("user_id", ASCENDING), ("type", ASCENDING)], unique=True, name="user_type_unique"),
+        IndexModel([("enabled", ASCENDING), ("next_fire_at", ASCENDING)], name="enabled_next_fire_at"),
+    ],
+}
+
+# Indexes an earlier version declared; dropped so writes stop maintaining them
+RETIRED_INDEXES: Dict[str, List[str]] = {
+    "cycles": ["user_start_date"],  # superseded by user_start_date_id
+}
+
+
+def router_queries() -> List[Dict[str, Any]]:
+    """The find shapes the routers issue, with placeholder values."""
+    user_id = ObjectId()
+    doc_id = ObjectId()
+    return [
+        {"collection": "users", "filter": {"email": "user@example.com"}},
+        {"collection": "users", "filter": {"_id": user_id}},
+        {"collection": "cycles", "filter": {"user_id": user_id}, "sort": [("start_date", ASCENDING)]},
+        {"collection": "cycles", "filter": {"user_id": user_id}, "sort": [("start_date", DESCENDING), ("_id", DESCENDING)]},
+        {
+            "collection": "cycles",
+            "filter": {"user_id": user_id, "$or": [
+                {"start_date": {"$lt": "2024-01-01"}},
+                {"start_date": "2024-01-01", "_id": {"$lt": doc_id}},
+            ]},
+            "sort": [("start_date", DESCENDING), ("_id", DESCENDING)],
+        },
+        {"collection": "cycles", "filter": {"_id": doc_id, "user_id": user_id}},
+        {
+            "collection": "cycles",
+            "filter": {"user_id": user_id, "$or": [
+                {"start_date": {"$gt": "2024-01-01"}},
+                {"start_date": "2024-01-01", "_id": {"$gt": doc_id}},
+            ]},
+            "sort": [("start_date", ASCENDING), ("_id", ASCENDING)],
+        },
+        {
+            "collection": "cycles",
+            "filter": {"user_id": user_id, "start_date": {"$gte": "2023-12-18", "$lte": "2024-01-31"}},
+            "sort": [("start_date", ASCENDING)],
+        },
+        {"collection": "symptoms", "filter": {"user_id": user_id, "date": "2024-01-01"}},
+        {
+            "collection": "symptoms",
+            "filter": {"user_id": user_id, "date": {"$gte": "2024-01-01", "$lte": "2024-01-07"}},
+            "sort": [("date", DESCENDING)],
+        },
+        {"collection": "symptoms", "filter": {"user_id": user_id}, "sort": [("date", DESCENDING)]},
+        {"collection": "symptoms", "filter": {"user_id": user_id, "date": {"$lt": "2024-01-01"}}, "sort": [("date", DESCENDING)]},
+        {"collection": "reminders", "filter": {"user_id": user_id}},
+        {"collection": "reminders", "filter": {"user_id": user_id, "type": "period"}},
+        {"collection": "reminders", "filter": {"_id": doc_id, "user_id": user_id}},
+    ]
+
+
+def unique_keys() -> List[tuple]:
+    """(collection, index name, key fields) for every declared unique index."""
+    return [
+        (collection, index.document["name"], [field for field, _ in index.document["key"].items()])
+        for collection, indexes in INDEXES.items()
+        for index in indexes
+        if index.document.get("unique")
+    ]
+
+
+async def ensure_indexes(db) -> List[str]:
+    """Create the declared indexes; return the unique ones blocked by duplicates.
+
+    Data written before the unique indexes existed can violate them. Such an
+    index is skipped and logged rather than failing startup; run
+    `python -m scripts.dedupe_unique_keys --apply` to remove the duplicates
+    and build it.
+    """
+    for collection, names in RETIRED_INDEXES.items():
+        existing = await db[collection].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection].drop_index(name)
+                logger.info("Dropped retired index %s.%s", collection, name)
+
+    conflicts = []
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await db[collection].create_indexes([index])
+            except OperationFailure as exc:
+                if exc.code != DUPLICATE_KEY:
+                    raise
+                name = f"{collection}.{index.document['name']}"
+                logger.error("Index %s not built, existing documents conflict: %s", name, exc)
+                conflicts.append(name)
+    return conflicts
+
+
+def _stages(plan: Any):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+async def verify_query_plans(db) -> None:
+    """Explain every router query and raise if any winning plan is a COLLSCAN."""
+    offenders = []
+    for query in router_queries():
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_stages(winning_plan)):
+            offenders.append(f"{query['collection']}: {query['filter']}")
+    if offenders:
+        raise RuntimeError("Queries without index support: " + "; ".join(offenders))
@@ -0,0 +1,149 @@
+from typing import Any, Dict, List
+from config import settings
+from services.cache_service import CacheBackend, TTLCache, invalidate_user
+from services.prediction_service import averages_from_cycle_stats
+
+# $dateDiff, and $lookup combining localField/foreignField with a pipeline
+MIN_SERVER_VERSION = (5, 0)
+
+SEVERITY_FIELDS = ("cramps", "bloating", "headache", "backache")
+BOOLEAN_FIELDS = ("breast_tenderness", "acne", "nausea")
+
+# Summaries are stamped with the user's symptoms_version and cycles_version;
+# a new log or a cycle edit (which moves phase boundaries) makes them stale.
+insights_cache: CacheBackend = TTLCache(
+    maxsize=settings.prediction_cache_size,
+    ttl=settings.prediction_cache_ttl_seconds,
+)
+
+
+def _cache_key(user_id) -> str:
+    return f"insights:{user_id}"
+
+
+def _parse_date(expr: str) -> Dict[str, Any]:
+    return {"$dateFromString": {"dateString": expr, "format": "%Y-%m-%d", "onError": None}}
+
+
+def _symptom_group() -> Dict[str, Any]:
+    group: Dict[str, Any] = {"logs": {"$sum": 1}}
+    for field in SEVERITY_FIELDS:
+        group[field] = {"$avg": f"${field}"}
+    for field in BOOLEAN_FIELDS:
+        group[field] = {"$avg": {"$cond": [f"${field}", 1, 0]}}
+    return group
+
+
+def insights_pipeline(user_id, avg_cycle: int, avg_period: int) -> List[Dict[str, Any]]:
+    """Per-phase and per-cycle-day symptom summary, computed inside MongoDB."""
+    half = avg_cycle // 2
+    return [
+        {"$match": {"user_id": user_id}},
+        # Attach the start of the cycle each log falls in: the latest cycle
+        # that started on or before the log date.
+        {"$lookup": {
+            "from": "cycles",
+            "localField": "user_id",
+            "foreignField": "user_id",
+            "let": {"day": "$date"},
+            "pipeline": [
+                {"$match": {"$expr": {"$lte": ["$start_date", "$$day"]}}},
+                {"$sort": {"start_date": -1}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "start_date": 1}},
+            ],
+            "as": "cycle",
+        }},
+        {"$unwind": "$cycle"},
+        {"$addFields": {"cycle_day": {"$add": [
+            {"$dateDiff": {
+                "startDate": _parse_date("$cycle.start_date"),
+                "endDate": _parse_date("$date"),
+                "unit": "day",
+            }},
+            1,
+        ]}}},
+        {"$match": {"cycle_day": {"$ne": None}}},
+        # Same boundaries as prediction_service.get_phase
+        {"$addFields": {"phase": {"$switch": {
+            "branches": [
+                {"case": {"$lte": ["$cycle_day", avg_period]}, "then": "menstruation"},
+                {"case": {"$lte": ["$cycle_day", half - 5]}, "then": "follicular"},
+                {"case": {"$lte": ["$cycle_day", half + 1]}, "then": "ovulation"},
+                {"case": {"$lte": ["$cycle_day", avg_cycle - 1]}, "then": "luteal"},
+            ],
+            "default": "late_luteal",
+        }}}},
+        {"$facet": {
+            "by_phase": [
+                {"$group": {"_id": "$phase", **_symptom_group()}},
+            ],
+            "by_cycle_day": [
+                {"$group": {"_id": "$cycle_day", **_symptom_group()}},
+                {"$sort": {"_id": 1}},
+            ],
+            "mood": [
+                {"$match": {"mood": {"$ne": None}}},
+                {"$group": {"_id": {"phase": "$phase", "value": "$mood"}, "count": {"$sum": 1}}},
+            ],
+            "energy": [
+                {"$match": {"energy": {"$ne": None}}},
+                {"$group": {"_id": {"phase": "$phase", "value": "$energy"}, "count": {"$sum": 1}}},
+            ],
+        }},
+    ]
+
+
+def _format_group(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "logs": row["logs"],
+        "severity": {f: round(row[f] or 0, 2) for f in SEVERITY_FIELDS},
+        "rates": {f: round(row[f] or 0, 2) for f in BOOLEAN_FIELDS},
+    }
+
+
+def _format_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    phases = {row["_id"]: _format_group(row) for row in result["by_phase"]}
+    for phase in phases.values():
+        phase["mood"] = {}
+        phase["energy"] = {}
+    for kind in ("mood", "energy"):
+        for row in result[kind]:
+            phases[row["_id"]["phase"]][kind][row["_id"]["value"]] = row["count"]
+    return {
+        "total_logs": sum(p["logs"] for p in phases.values()),
+        "phases": phases,
+        "cycle_days": [
+            {"day": row["_id"], **_format_group(row)} for row in result["by_cycle_day"]
+        ],
+    }
+
+
+async def get_user_insights(db, user: Dict[str, Any]) -> Dict[str, Any]:
+    stamp = [user.get("symptoms_version", 0), user.get("cycles_version", 0)]
+    key = _cache_key(user["_id"])
+    cached = await insights_cache.get(key)
+    if cached and cached["stamp"] == stamp:
+        return cached["summary"]
+
+    if user.get("cycle_stats"):
+        avg_cycle, avg_period = averages_from_cycle_stats(user["cycle_stats"])
+    else:
+        avg_cycle, avg_period = 28, 5
+    cursor = db.symptoms.aggregate(insights_pipeline(user["_id"], avg_cycle, avg_period))
+    results = await cursor.to_list(length=1)
+    summary = _format_summary(results[0]) if results else _format_summary(
+        {"by_phase": [], "by_cycle_day": [], "mood": [], "energy": []}
+    )
+    summary["average_cycle_length"] = avg_cycle
+    summary["average_period_length"] = avg_period
+
+    await insights_cache.set(key, {"stamp": stamp, "summary": summary})
+    return summary
+
+
+async def mark_symptoms_changed(db, user_id) -> None:
+    """Bump the user's symptom version and drop their cached insights."""
+    await db.users.update_one({"_id": user_id}, {"$inc": {"symptoms_version": 1}})
+    await insights_cache.delete(_cache_key(user_id))
+    await invalidate_user(user_id)
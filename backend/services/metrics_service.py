@@ -0,0 +1,187 @@
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_CALL_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+class Histogram:
+    """Prometheus-style histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., overflow count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._series.items():
+            base = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)
+            )
+            prefix = f"{base}," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "mycare_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+request_db_calls = Histogram(
+    "mycare_http_request_db_calls",
+    "MongoDB commands issued per HTTP request.",
+    ("route",),
+    buckets=DB_CALL_BUCKETS,
+)
+request_db_seconds = Histogram(
+    "mycare_http_request_db_seconds",
+    "Time spent in MongoDB commands per HTTP request.",
+    ("route",),
+)
+span_duration = Histogram(
+    "mycare_span_duration_seconds",
+    "Duration of instrumented code sections.",
+    ("span",),
+)
+
+
+class RequestMetrics:
+    """Per-request accumulator, reachable from driver threads via the context."""
+
+    __slots__ = ("db_calls", "db_seconds")
+
+    def __init__(self):
+        self.db_calls = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        span_duration.observe((self.name,), time.perf_counter() - self.start)
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name: str):
+    """Time a block of code; a shared no-op when metrics are disabled."""
+    if not settings.metrics_enabled:
+        return _NO_SPAN
+    return _Span(name)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and Mongo usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            # Unmatched paths share one series to keep label cardinality bounded
+            template = route.path if route is not None else "unmatched"
+            request_duration.observe((scope["method"], template, str(status_code)), elapsed)
+            request_db_calls.observe((template,), metrics.db_calls)
+            request_db_seconds.observe((template,), metrics.db_seconds)
+
+
+def _counter(name: str, help_text: str, samples: List[Tuple[str, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f"{name}{labels} {value}" for labels, value in samples]
+    return lines
+
+
+def render_metrics(db_snapshot: dict) -> str:
+    """Text exposition of the request histograms plus a DbMetrics snapshot."""
+    commands = db_snapshot["commands"]
+    pool = db_snapshot["pool"]
+    lines: List[str] = []
+    for histogram in (request_duration, request_db_calls, request_db_seconds, span_duration):
+        lines += histogram.render()
+    lines += _counter(
+        "mycare_mongo_commands_total", "MongoDB commands by name.",
+        [(f'{{command="{name}"}}', entry["count"]) for name, entry in commands.items()],
+    )
+    lines += _counter(
+        "mycare_mongo_command_failures_total", "Failed MongoDB commands by name.",
+        [(f'{{command="{name}"}}', entry["failures"]) for name, entry in commands.items()],
+    )
+    lines += _counter(
+        "mycare_mongo_command_seconds_total", "Time spent in MongoDB commands by name.",
+        [(f'{{command="{name}"}}', entry["total_ms"] / 1000) for name, entry in commands.items()],
+    )
+    lines += _counter("mycare_mongo_pool_checkouts_total", "Connection checkouts.", [("", pool["checkouts"])])
+    lines += _counter(
+        "mycare_mongo_pool_checkout_failures_total", "Failed connection checkouts.",
+        [("", pool["checkout_failures"])],
+    )
+    lines += _counter(
+        "mycare_mongo_pool_wait_seconds_total", "Time spent waiting for a connection.",
+        [("", pool["wait_total_ms"] / 1000)],
+    )
+    lines += [
+        "# HELP mycare_mongo_pool_checked_out Connections currently checked out.",
+        "# TYPE mycare_mongo_pool_checked_out gauge",
+        f"mycare_mongo_pool_checked_out {pool['checked_out']}",
+    ]
+    return "\n".join(lines) + "\n"
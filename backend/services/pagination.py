@@ -0,0 +1,40 @@
+import base64
+import json
+from typing import Any, AsyncIterator, Callable, List, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Optional[List[str]]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        return None
+    return values
+
+
+def keyset_after(field: str, value: str, doc_id: Optional[str] = None) -> Optional[dict]:
+    """Filter for rows strictly after (value, _id) in descending (field, _id) order."""
+    if doc_id is None:
+        return {field: {"$lt": value}}
+    try:
+        oid = ObjectId(doc_id)
+    except (InvalidId, TypeError):
+        return None
+    return {"$or": [{field: {"$lt": value}}, {field: value, "_id": {"$lt": oid}}]}
+
+
+async def ndjson_rows(cursor, serialize: Callable[[dict], bytes]) -> AsyncIterator[bytes]:
+    """Yield one JSON line per document as the Motor cursor produces them."""
+    async for doc in cursor:
+        yield serialize(doc) + b"\n"
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+from services.prediction_service import PHASE_INFO, format_ordinal, to_ordinal
+
+# Phase order matches the branch order in prediction_service.get_phase.
+PHASES = ("menstruation", "follicular", "ovulation", "luteal", "late_luteal")
+FUTURE_CYCLES = 6
+NO_END = 0  # end_ordinal value for cycles without an end date
+NO_START = 0  # start_ordinal value for cycles whose start_date does not parse
+
+
+class BatchPrediction:
+    """Column-oriented predictions for many users, one row per user."""
+
+    def __init__(self, **columns: np.ndarray):
+        self.user_ids = columns["user_ids"]
+        self.average_cycle_length = columns["average_cycle_length"]
+        self.average_period_length = columns["average_period_length"]
+        self.cycle_count = columns["cycle_count"]
+        self.last_start = columns["last_start"]
+        self.next_period = columns["next_period"]
+        self.ovulation = columns["ovulation"]
+        self.fertile_window_start = columns["fertile_window_start"]
+        self.fertile_window_end = columns["fertile_window_end"]
+        self.luteal_phase_start = columns["luteal_phase_start"]
+        self.days_until_next_period = columns["days_until_next_period"]
+        self.current_cycle_day = columns["current_cycle_day"]
+        self.phase = columns["phase"]
+        self.future_start = columns["future_start"]
+        self.future_end = columns["future_end"]
+        self.future_ovulation = columns["future_ovulation"]
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def to_dict(self, i: int) -> Dict[str, Any]:
+        """Row `i` in the same shape predict_next_period returns."""
+        phase = PHASES[self.phase[i]]
+        hormones, tips = PHASE_INFO[phase]
+        return {
+            "next_period_date": format_ordinal(int(self.next_period[i])),
+            "ovulation_date": format_ordinal(int(self.ovulation[i])),
+            "fertile_window_start": format_ordinal(int(self.fertile_window_start[i])),
+            "fertile_window_end": format_ordinal(int(self.fertile_window_end[i])),
+            "luteal_phase_start": format_ordinal(int(self.luteal_phase_start[i])),
+            "days_until_next_period": int(self.days_until_next_period[i]),
+            "current_cycle_day": int(self.current_cycle_day[i]),
+            "current_phase": phase,
+            "hormone_levels": dict(hormones),
+            "phase_tips": list(tips),
+            "average_cycle_length": int(self.average_cycle_length[i]),
+            "average_period_length": int(self.average_period_length[i]),
+            "future_predictions": [
+                {
+                    "start_date": format_ordinal(int(self.future_start[i, k])),
+                    "end_date": format_ordinal(int(self.future_end[i, k])),
+                    "ovulation_date": format_ordinal(int(self.future_ovulation[i, k])),
+                }
+                for k in range(FUTURE_CYCLES)
+            ],
+        }
+
+    def iter_dicts(self) -> Iterator[Tuple[Any, Dict[str, Any]]]:
+        for i in range(len(self)):
+            yield self.user_ids[i], self.to_dict(i)
+
+
+def _grouped_average(values, valid, groups, n_groups, default):
+    total = np.bincount(groups, weights=np.where(valid, values, 0), minlength=n_groups)
+    count = np.bincount(groups, weights=valid, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # np.rint rounds half to even, matching Python's round()
+        avg = np.rint(total / count)
+    return np.where(count > 0, avg, default).astype(np.int64)
+
+
+def predict_batch(
+    user_ids,
+    start_ordinals,
+    end_ordinals,
+    sort_keys=None,
+    today: Optional[int] = None,
+) -> BatchPrediction:
+    """Vectorized predict_next_period over a columnar cycle table.
+
+    Each row is one cycle: (user_id, start ordinal or NO_START, end ordinal
+    or NO_END). Rows may arrive in any order; within a user they are ordered
+    by `sort_keys` (default: the start ordinal). Like the scalar path, a
+    cycle with no start contributes no duration and breaks the gaps on both
+    sides of it. Users without rows are absent, and so are users whose
+    latest cycle has no start, where predict_next_period raises.
+    """
+    if today is None:
+        today = datetime.utcnow().toordinal()
+
+    user_ids = np.asarray(user_ids)
+    starts = np.asarray(start_ordinals, dtype=np.int64)
+    ends = np.asarray(end_ordinals, dtype=np.int64)
+    keys = starts if sort_keys is None else np.asarray(sort_keys)
+
+    order = np.lexsort((keys, user_ids))
+    user_ids, starts, ends = user_ids[order], starts[order], ends[order]
+
+    users, first, counts = np.unique(user_ids, return_index=True, return_counts=True)
+    n_users = len(users)
+    groups = np.repeat(np.arange(n_users), counts)
+    has_start = starts != NO_START
+
+    durations = ends - starts + 1
+    valid_duration = has_start & (ends != NO_END) & (durations >= 1) & (durations <= 14)
+    avg_period = _grouped_average(durations, valid_duration, groups, n_users, 5)
+
+    gaps = starts[1:] - starts[:-1]
+    valid_gap = (
+        (groups[1:] == groups[:-1]) & has_start[1:] & has_start[:-1] & (gaps >= 15) & (gaps <= 60)
+    )
+    avg_cycle = _grouped_average(gaps, valid_gap, groups[1:], n_users, 28)
+
+    last_start = starts[first + counts - 1]
+    keep = last_start != NO_START
+    if not keep.all():
+        users, counts, last_start = users[keep], counts[keep], last_start[keep]
+        avg_cycle, avg_period = avg_cycle[keep], avg_period[keep]
+    next_period = last_start + avg_cycle
+    ovulation = next_period - 14
+    cycle_day = today - last_start + 1
+
+    half = avg_cycle // 2
+    phase = np.select(
+        [
+            cycle_day <= avg_period,
+            cycle_day <= half - 5,
+            cycle_day <= half + 1,
+            cycle_day <= avg_cycle - 1,
+        ],
+        [0, 1, 2, 3],
+        default=4,
+    )
+
+    steps = np.arange(FUTURE_CYCLES, dtype=np.int64)
+    future_start = next_period[:, None] + avg_cycle[:, None] * steps
+
+    return BatchPrediction(
+        user_ids=users,
+        average_cycle_length=avg_cycle,
+        average_period_length=avg_period,
+        cycle_count=counts,
+        last_start=last_start,
+        next_period=next_period,
+        ovulation=ovulation,
+        fertile_window_start=ovulation - 5,
+        fertile_window_end=ovulation + 1,
+        luteal_phase_start=ovulation + 2,
+        days_until_next_period=next_period - today,
+        current_cycle_day=cycle_day,
+        phase=phase,
+        future_start=future_start,
+        future_end=future_start + avg_period[:, None] - 1,
+        future_ovulation=future_start + half[:, None],
+    )
+
+
+def cycles_to_columns(cycles: Iterable[Dict[str, Any]]):
+    """Turn cycle documents into (user_ids, start_ordinals, end_ordinals, sort_keys).
+
+    Cycles whose start_date does not parse are kept with NO_START, and rows
+    are ranked by the raw start_date string, which is how parse_cycles
+    orders them; for valid dates that is the same as date order.
+    """
+    user_ids, start_dates, starts, ends = [], [], [], []
+    for cycle in cycles:
+        start = to_ordinal(cycle.get("start_date"))
+        end = to_ordinal(cycle["end_date"]) if start is not None and cycle.get("end_date") else None
+        user_ids.append(str(cycle["user_id"]))
+        start_dates.append(cycle.get("start_date") or "")
+        starts.append(NO_START if start is None else start)
+        ends.append(NO_END if end is None else end)
+    _, sort_keys = np.unique(np.array(start_dates, dtype=str), return_inverse=True)
+    return (
+        np.array(user_ids),
+        np.array(starts, dtype=np.int64),
+        np.array(ends, dtype=np.int64),
+        sort_keys.reshape(-1),
+    )
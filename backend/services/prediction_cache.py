@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config import settings
+from services.metrics_service import span
+from services.cache_service import CacheBackend, TTLCache, invalidate_user
+from services.cycle_stats_service import LOCK_FIELD, CycleStatsLock, rebuild_cycle_stats
+from services.prediction_service import (
+    EMPTY_PREDICTION, averages_from_cycle_stats, build_prediction, summarize_cycles, to_ordinal,
+)
+
+# Number of most recent cycles returned as history on the dashboard
+HISTORY_LENGTH = 100
+
+# Per-user materialized summary. Entries are stamped with the user's
+# cycles_version, profile_version (the profile averages are the fallback
+# with too little history) and the UTC date, so a cycle write, onboarding
+# or a day rollover makes them stale even if an explicit invalidation is
+# missed.
+prediction_cache: CacheBackend = TTLCache(
+    maxsize=settings.prediction_cache_size,
+    ttl=settings.prediction_cache_ttl_seconds,
+)
+
+
+def set_prediction_cache(backend: CacheBackend) -> None:
+    """Replace the in-process cache with a shared store."""
+    global prediction_cache
+    prediction_cache = backend
+
+
+def _cache_key(user_id) -> str:
+    return f"prediction:{user_id}"
+
+
+def _prediction_from_cycle_stats(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """O(1) prediction from the aggregates on the user document, if present."""
+    cycle_stats = user.get("cycle_stats")
+    if not cycle_stats:
+        return None
+    if not cycle_stats.get("count"):
+        return dict(EMPTY_PREDICTION)
+    last_start = to_ordinal(cycle_stats.get("last_start"))
+    if last_start is None:
+        return None
+    avg_cycle, avg_period = averages_from_cycle_stats(cycle_stats)
+    return build_prediction(last_start, avg_cycle, avg_period)
+
+
+async def get_user_prediction(db, user: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the user's prediction, without touching cycles when aggregates exist."""
+    with span("predict_next_period"):
+        prediction = _prediction_from_cycle_stats(user)
+    if prediction is not None:
+        return prediction
+    return (await get_user_summary(db, user))["prediction"]
+
+
+async def get_user_summary(db, user: Dict[str, Any]) -> Dict[str, Any]:
+    """Return {"prediction", "stats"} for the user, computing it on a cache miss."""
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    stamp = [user.get("cycles_version", 0), user.get("profile_version", 0), today]
+    key = _cache_key(user["_id"])
+
+    cached = await prediction_cache.get(key)
+    if cached and cached["stamp"] == stamp:
+        return cached
+
+    cursor = db.cycles.find(
+        {"user_id": user["_id"]}, {"_id": 0, "start_date": 1, "end_date": 1}
+    ).sort("start_date", -1)
+    cycles = await cursor.to_list(length=HISTORY_LENGTH)
+    cycles.reverse()
+    args = (
+        cycles,
+        user.get("average_cycle_length", 28),
+        user.get("average_period_length", 5),
+    )
+    # Long histories are parsed in a worker thread so the loop keeps serving
+    with span("predict_next_period"):
+        if len(cycles) > settings.prediction_offload_threshold:
+            entry = await asyncio.to_thread(summarize_cycles, *args)
+        else:
+            entry = summarize_cycles(*args)
+
+    # History covers the recent window; averages, count and the prediction
+    # come from the whole-history aggregates when they are available.
+    prediction = _prediction_from_cycle_stats(user)
+    if prediction is not None and cycles:
+        avg_cycle, avg_period = averages_from_cycle_stats(user["cycle_stats"])
+        entry["stats"].update({
+            "average_cycle_length": avg_cycle,
+            "average_period_length": avg_period,
+            "cycle_count": user["cycle_stats"]["count"],
+        })
+        entry["prediction"] = prediction
+
+    entry["stamp"] = stamp
+    await prediction_cache.set(key, entry)
+    return entry
+
+
+async def mark_cycles_changed(
+    db,
+    user_id,
+    stats_update: Optional[Dict[str, Any]] = None,
+    lock: Optional[CycleStatsLock] = None,
+) -> None:
+    """Apply a cycle_stats update, bump the cycle version and drop cached state.
+
+    A stats_update computed from neighbouring cycles must be applied under
+    the cycle_stats_lock it was computed in; it then also releases the lock.
+    """
+    if stats_update:
+        update = {op: dict(fields) for op, fields in stats_update.items()}
+        update.setdefault("$inc", {})["cycles_version"] = 1
+        query = {"_id": user_id, "cycle_stats": {"$exists": True}}
+        if lock is not None:
+            query.update(lock.held)
+            update.setdefault("$unset", {})[LOCK_FIELD] = ""
+        result = await db.users.update_one(query, update)
+        if result.matched_count == 0:
+            # Users created before aggregates existed get backfilled once;
+            # so does a user whose lease expired before the delta landed.
+            await rebuild_cycle_stats(db, user_id)
+            await db.users.update_one({"_id": user_id}, {"$inc": {"cycles_version": 1}})
+    else:
+        await db.users.update_one({"_id": user_id}, {"$inc": {"cycles_version": 1}})
+    await prediction_cache.delete(_cache_key(user_id))
+    await invalidate_user(user_id)
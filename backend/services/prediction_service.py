@@ -1,43 +1,135 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from typing import List, Optional, Dict, Any
 
+DATE_FORMAT = "%Y-%m-%d"
 
-def calculate_cycle_stats(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate average cycle length and period duration from history."""
-    if not cycles:
+PHASE_INFO = {
+    "menstruation": (
+        {"estrogen": "low", "progesterone": "low", "testosterone": "low"},
+        [
+            "Rest and sleep are your best friends right now.",
+            "Eat iron-rich foods like spinach and lean meats.",
+            "Try gentle stretches or yoga for cramp relief."
+        ],
+    ),
+    "follicular": (
+        {"estrogen": "rising", "progesterone": "low", "testosterone": "steady"},
+        [
+            "Your energy is rising! Great time for new projects.",
+            "Try high-intensity workouts if you feel up to it.",
+            "Eat fermented foods to support gut health."
+        ],
+    ),
+    "ovulation": (
+        {"estrogen": "high", "progesterone": "low", "testosterone": "peak"},
+        [
+            "You're at your peak! You might feel more social.",
+            "Focus on anti-inflammatory foods like berries.",
+            "Keep an eye out for changes in cervical discharge."
+        ],
+    ),
+    "luteal": (
+        {"estrogen": "steady", "progesterone": "rising", "testosterone": "low"},
+        [
+            "Slow down and focus on self-care.",
+            "Eat complex carbs to stabilize energy levels.",
+            "Light cardio is better than intense workouts now."
+        ],
+    ),
+    "late_luteal": (
+        {"estrogen": "falling", "progesterone": "falling", "testosterone": "low"},
+        [
+            "Drink plenty of water to reduce bloating.",
+            "Limit caffeine and salt to manage PMS symptoms.",
+            "Gentle walks can help improve your mood."
+        ],
+    ),
+}
+
+EMPTY_PREDICTION = {
+    "next_period_date": None,
+    "ovulation_date": None,
+    "fertile_window_start": None,
+    "fertile_window_end": None,
+    "luteal_phase_start": None,
+    "days_until_next_period": None,
+    "current_cycle_day": None,
+    "current_phase": "unknown",
+}
+
+
+class ParsedCycle:
+    """A cycle with its dates parsed once into ordinal day numbers."""
+
+    __slots__ = ("start_date", "start", "end")
+
+    def __init__(self, start_date: str, start: Optional[int], end: Optional[int]):
+        self.start_date = start_date
+        self.start = start
+        self.end = end
+
+
+def to_ordinal(value: Optional[str]) -> Optional[int]:
+    try:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    except Exception:
+        return None
+
+
+def format_ordinal(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+def parse_cycles(cycles: List[Dict[str, Any]]) -> List[ParsedCycle]:
+    """Sort cycles by start date and parse each start/end date exactly once."""
+    parsed = []
+    for cycle in sorted(cycles, key=lambda c: c["start_date"]):
+        end_date = cycle.get("end_date")
+        parsed.append(ParsedCycle(
+            cycle["start_date"],
+            to_ordinal(cycle["start_date"]),
+            to_ordinal(end_date) if end_date else None,
+        ))
+    return parsed
+
+
+def get_phase(cycle_day: int, avg_cycle: int, avg_period: int) -> str:
+    if cycle_day <= avg_period:
+        return "menstruation"
+    if cycle_day <= (avg_cycle // 2) - 5:
+        return "follicular"
+    if cycle_day <= (avg_cycle // 2) + 1:
+        return "ovulation"
+    if cycle_day <= avg_cycle - 1:
+        return "luteal"
+    return "late_luteal"
+
+
+def _stats_from_parsed(parsed: List[ParsedCycle]) -> Dict[str, Any]:
+    if not parsed:
         return {"average_cycle_length": 28, "average_period_length": 5}
 
     history = []
     cycle_lengths = []
     period_lengths = []
 
-    sorted_cycles = sorted(cycles, key=lambda c: c["start_date"])
-
-    for i, cycle in enumerate(sorted_cycles):
+    prev_start = None
+    for i, cycle in enumerate(parsed):
         duration = None
-        if cycle.get("end_date"):
-            try:
-                start = datetime.strptime(cycle["start_date"], "%Y-%m-%d")
-                end = datetime.strptime(cycle["end_date"], "%Y-%m-%d")
-                duration = (end - start).days + 1
-                if 1 <= duration <= 14:
-                    period_lengths.append(duration)
-            except Exception:
-                pass
+        if cycle.end is not None and cycle.start is not None:
+            duration = cycle.end - cycle.start + 1
+            if 1 <= duration <= 14:
+                period_lengths.append(duration)
 
         gap = None
-        if i > 0:
-            try:
-                prev_start = datetime.strptime(sorted_cycles[i - 1]["start_date"], "%Y-%m-%d")
-                curr_start = datetime.strptime(cycle["start_date"], "%Y-%m-%d")
-                gap = (curr_start - prev_start).days
-                if 15 <= gap <= 60:
-                    cycle_lengths.append(gap)
-            except Exception:
-                pass
-        
+        if i > 0 and prev_start is not None and cycle.start is not None:
+            gap = cycle.start - prev_start
+            if 15 <= gap <= 60:
+                cycle_lengths.append(gap)
+        prev_start = cycle.start
+
         history.append({
-            "date": cycle["start_date"],
+            "date": cycle.start_date,
             "length": gap,
             "duration": duration
         })
@@ -48,112 +140,105 @@ def calculate_cycle_stats(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
     return {
         "average_cycle_length": avg_cycle,
         "average_period_length": avg_period,
-        "cycle_count": len(cycles),
+        "cycle_count": len(parsed),
         "history": history
     }
 
 
-def predict_next_period(
-    cycles: List[Dict[str, Any]],
-    user_avg_cycle: int = 28,
-    user_avg_period: int = 5,
+def build_prediction(
+    last_start: int,
+    avg_cycle: int,
+    avg_period: int,
+    today: Optional[int] = None,
 ) -> Dict[str, Any]:
-    """Predict next period start date, ovulation window, and fertile window."""
-    stats = calculate_cycle_stats(cycles)
-    avg_cycle = stats.get("average_cycle_length", user_avg_cycle)
-    avg_period = stats.get("average_period_length", user_avg_period)
-
-    if not cycles:
-        return {
-            "next_period_date": None,
-            "ovulation_date": None,
-            "fertile_window_start": None,
-            "fertile_window_end": None,
-            "luteal_phase_start": None,
-            "days_until_next_period": None,
-            "current_cycle_day": None,
-            "current_phase": "unknown",
-        }
-
-    sorted_cycles = sorted(cycles, key=lambda c: c["start_date"], reverse=True)
-    last_start = datetime.strptime(sorted_cycles[0]["start_date"], "%Y-%m-%d")
-
-    next_period = last_start + timedelta(days=avg_cycle)
-    ovulation = next_period - timedelta(days=14)
-    fertile_start = ovulation - timedelta(days=5)
-    fertile_end = ovulation + timedelta(days=1)
-    luteal_start = ovulation + timedelta(days=2)
-
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    days_until = (next_period - today).days
-    current_cycle_day = (today - last_start).days + 1
-
-    # Determine current phase, tips, and hormone levels
-    if current_cycle_day <= avg_period:
-        phase = "menstruation"
-        hormones = {"estrogen": "low", "progesterone": "low", "testosterone": "low"}
-        tips = [
-            "Rest and sleep are your best friends right now.",
-            "Eat iron-rich foods like spinach and lean meats.",
-            "Try gentle stretches or yoga for cramp relief."
-        ]
-    elif current_cycle_day <= (avg_cycle // 2) - 5:
-        phase = "follicular"
-        hormones = {"estrogen": "rising", "progesterone": "low", "testosterone": "steady"}
-        tips = [
-            "Your energy is rising! Great time for new projects.",
-            "Try high-intensity workouts if you feel up to it.",
-            "Eat fermented foods to support gut health."
-        ]
-    elif current_cycle_day <= (avg_cycle // 2) + 1:
-        phase = "ovulation"
-        hormones = {"estrogen": "high", "progesterone": "low", "testosterone": "peak"}
-        tips = [
-            "You're at your peak! You might feel more social.",
-            "Focus on anti-inflammatory foods like berries.",
-            "Keep an eye out for changes in cervical discharge."
-        ]
-    elif current_cycle_day <= avg_cycle - 1:
-        phase = "luteal"
-        hormones = {"estrogen": "steady", "progesterone": "rising", "testosterone": "low"}
-        tips = [
-            "Slow down and focus on self-care.",
-            "Eat complex carbs to stabilize energy levels.",
-            "Light cardio is better than intense workouts now."
-        ]
-    else:
-        phase = "late_luteal"
-        hormones = {"estrogen": "falling", "progesterone": "falling", "testosterone": "low"}
-        tips = [
-            "Drink plenty of water to reduce bloating.",
-            "Limit caffeine and salt to manage PMS symptoms.",
-            "Gentle walks can help improve your mood."
-        ]
+    """Build the prediction payload from the last period start and averages."""
+    if today is None:
+        today = datetime.utcnow().toordinal()
+
+    next_period = last_start + avg_cycle
+    ovulation = next_period - 14
+    fertile_start = ovulation - 5
+    fertile_end = ovulation + 1
+    luteal_start = ovulation + 2
+
+    days_until = next_period - today
+    current_cycle_day = today - last_start + 1
+
+    phase = get_phase(current_cycle_day, avg_cycle, avg_period)
+    hormones, tips = PHASE_INFO[phase]
 
     # Calculate future cycles
     future_predictions = []
     current_proj_start = next_period
     for _ in range(6):
-        proj_ovulation = current_proj_start + timedelta(days=avg_cycle // 2)
         future_predictions.append({
-            "start_date": current_proj_start.strftime("%Y-%m-%d"),
-            "end_date": (current_proj_start + timedelta(days=avg_period - 1)).strftime("%Y-%m-%d"),
-            "ovulation_date": proj_ovulation.strftime("%Y-%m-%d")
+            "start_date": format_ordinal(current_proj_start),
+            "end_date": format_ordinal(current_proj_start + avg_period - 1),
+            "ovulation_date": format_ordinal(current_proj_start + avg_cycle // 2)
         })
-        current_proj_start += timedelta(days=avg_cycle)
+        current_proj_start += avg_cycle
 
     return {
-        "next_period_date": next_period.strftime("%Y-%m-%d"),
-        "ovulation_date": ovulation.strftime("%Y-%m-%d"),
-        "fertile_window_start": fertile_start.strftime("%Y-%m-%d"),
-        "fertile_window_end": fertile_end.strftime("%Y-%m-%d"),
-        "luteal_phase_start": luteal_start.strftime("%Y-%m-%d"),
+        "next_period_date": format_ordinal(next_period),
+        "ovulation_date": format_ordinal(ovulation),
+        "fertile_window_start": format_ordinal(fertile_start),
+        "fertile_window_end": format_ordinal(fertile_end),
+        "luteal_phase_start": format_ordinal(luteal_start),
         "days_until_next_period": days_until,
         "current_cycle_day": current_cycle_day,
         "current_phase": phase,
-        "hormone_levels": hormones,
-        "phase_tips": tips,
+        "hormone_levels": dict(hormones),
+        "phase_tips": list(tips),
         "average_cycle_length": avg_cycle,
         "average_period_length": avg_period,
         "future_predictions": future_predictions
     }
+
+
+def summarize_cycles(
+    cycles: List[Dict[str, Any]],
+    user_avg_cycle: int = 28,
+    user_avg_period: int = 5,
+    today: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Parse and sort the history once and return {"stats", "prediction"}."""
+    parsed = parse_cycles(cycles)
+    stats = _stats_from_parsed(parsed)
+
+    if not parsed:
+        return {"stats": stats, "prediction": dict(EMPTY_PREDICTION)}
+
+    last = parsed[-1]
+    if last.start is None:
+        raise ValueError(f"Invalid start_date: {last.start_date!r}")
+
+    prediction = build_prediction(
+        last.start,
+        stats.get("average_cycle_length", user_avg_cycle),
+        stats.get("average_period_length", user_avg_period),
+        today=today,
+    )
+    return {"stats": stats, "prediction": prediction}
+
+
+def averages_from_cycle_stats(cycle_stats: Dict[str, Any]):
+    """(avg_cycle, avg_period) from the running sums kept on the user document."""
+    gap_count = cycle_stats.get("gap_count", 0)
+    duration_count = cycle_stats.get("duration_count", 0)
+    avg_cycle = round(cycle_stats["gap_sum"] / gap_count) if gap_count else 28
+    avg_period = round(cycle_stats["duration_sum"] / duration_count) if duration_count else 5
+    return avg_cycle, avg_period
+
+
+def calculate_cycle_stats(cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Calculate average cycle length and period duration from history."""
+    return _stats_from_parsed(parse_cycles(cycles))
+
+
+def predict_next_period(
+    cycles: List[Dict[str, Any]],
+    user_avg_cycle: int = 28,
+    user_avg_period: int = 5,
+) -> Dict[str, Any]:
+    """Predict next period start date, ovulation window, and fertile window."""
+    return summarize_cycles(cycles, user_avg_cycle, user_avg_period)["prediction"]
@@ -0,0 +1,65 @@
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class RateLimitBackend:
+    """Token-bucket store interface.
+
+    Swap in a shared store (e.g. Redis with a Lua script) so limits hold
+    across workers by implementing take().
+    """
+
+    async def take(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        raise NotImplementedError
+
+
+class InMemoryTokenBucket(RateLimitBackend):
+    """Per-process buckets, refilled lazily on access; idle keys are evicted LRU."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, capacity: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True, 0.0
+        return False, (1 - bucket[0]) / rate
+
+
+rate_limit_backend: RateLimitBackend = InMemoryTokenBucket()
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    """Replace the in-process buckets with a shared store."""
+    global rate_limit_backend
+    rate_limit_backend = backend
+
+
+class TokenBucketLimit:
+    """A named limit (per_minute sustained, burst capacity) with counters."""
+
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.name = name
+        self.rate = per_minute / 60
+        self.capacity = burst
+        self.stats = {"allowed": 0, "rejected": 0}
+
+    async def check(self, key: str) -> Tuple[bool, float]:
+        allowed, retry_after = await rate_limit_backend.take(
+            f"{self.name}:{key}", self.rate, self.capacity
+        )
+        self.stats["allowed" if allowed else "rejected"] += 1
+        return allowed, retry_after
@@ -0,0 +1,297 @@
+import asyncio
+import heapq
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from services.prediction_cache import get_user_prediction
+
+logger = logging.getLogger("mycare.reminders")
+
+# Reminders whose timing follows the predicted cycle; the others fire daily.
+CYCLE_REMINDER_TYPES = ("period", "ovulation")
+
+# next_fire_at for reminders that cannot currently be scheduled (bad time,
+# no cycle history). They are picked up again when reset to None.
+NEVER = datetime(9999, 1, 1)
+
+LEASE_ID = "reminder_scheduler"
+
+
+class ReminderSink:
+    """Where due reminders are delivered. Implement deliver() for push/email."""
+
+    async def deliver(self, reminder: Dict[str, Any], fire_at: datetime) -> None:
+        raise NotImplementedError
+
+
+class LogSink(ReminderSink):
+    async def deliver(self, reminder: Dict[str, Any], fire_at: datetime) -> None:
+        logger.info(
+            "Reminder %s (%s) for user %s due at %s",
+            reminder["_id"], reminder["type"], reminder["user_id"], fire_at.isoformat(),
+        )
+
+
+class QueueSink(ReminderSink):
+    def __init__(self, maxsize: int = 0):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def deliver(self, reminder: Dict[str, Any], fire_at: datetime) -> None:
+        await self.queue.put((fire_at, reminder))
+
+
+def _parse_time(value: str) -> Optional[Tuple[int, int]]:
+    try:
+        parsed = datetime.strptime(value, "%H:%M")
+    except (TypeError, ValueError):
+        return None
+    return parsed.hour, parsed.minute
+
+
+def next_fire_at(
+    reminder: Dict[str, Any],
+    prediction: Optional[Dict[str, Any]],
+    now: datetime,
+) -> datetime:
+    """The next UTC instant after `now` at which the reminder should fire."""
+    clock = _parse_time(reminder.get("time"))
+    if clock is None:
+        return NEVER
+    hour, minute = clock
+
+    if reminder["type"] not in CYCLE_REMINDER_TYPES:
+        fire = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return fire if fire > now else fire + timedelta(days=1)
+
+    if not prediction or not prediction.get("next_period_date"):
+        return NEVER
+    if reminder["type"] == "period":
+        dates = [prediction["next_period_date"]]
+        dates += [p["start_date"] for p in prediction.get("future_predictions", [])]
+    else:
+        dates = [prediction["ovulation_date"]]
+        dates += [p["ovulation_date"] for p in prediction.get("future_predictions", [])]
+
+    days_before = reminder.get("days_before", 1)
+    for value in dates:
+        day = datetime.strptime(value, "%Y-%m-%d") - timedelta(days=days_before)
+        fire = day.replace(hour=hour, minute=minute)
+        if fire > now:
+            return fire
+    return NEVER
+
+
+async def reset_cycle_reminders(db, user_id) -> None:
+    """Mark the user's cycle-based reminders for lazy rescheduling."""
+    await db.reminders.update_many(
+        {"user_id": user_id, "type": {"$in": list(CYCLE_REMINDER_TYPES)}},
+        {"$set": {"next_fire_at": None}},
+    )
+
+
+class ReminderScheduler:
+    """Fires reminders from a heap holding only the next `horizon` of work.
+
+    Every reminder document carries a persisted next_fire_at. Each tick:
+      1. schedules a batch of reminders whose next_fire_at is unset (new,
+         edited, or reset after a cycle change),
+      2. loads reminders due within the horizon into the heap with one
+         indexed range query, once per horizon window,
+      3. pops and delivers due entries, then persists their next instant.
+    Delivery is claimed with a compare-and-set on next_fire_at, so several
+    instances never deliver the same occurrence twice.
+
+    Occurrences more than `grace` overdue (after downtime, or a stalled
+    loop) are advanced to their next instant without being delivered.
+
+    Every worker may run a scheduler; only the holder of the lease in the
+    `scheduler_leases` collection ticks, and the others take over when it
+    stops renewing it.
+    """
+
+    def __init__(
+        self,
+        db,
+        sink: ReminderSink,
+        tick_seconds: float = 30,
+        horizon_seconds: float = 900,
+        grace_seconds: float = 300,
+        batch_size: int = 1000,
+    ):
+        self.db = db
+        self.sink = sink
+        self.tick_seconds = tick_seconds
+        self.horizon = timedelta(seconds=horizon_seconds)
+        self.grace = timedelta(seconds=grace_seconds)
+        self.batch_size = batch_size
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{ObjectId()}"
+        self.lease = timedelta(seconds=3 * tick_seconds)
+        self.leader = False
+        self._heap: List[Tuple[datetime, Any]] = []
+        self._loaded_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "delivered": 0, "scheduled": 0, "skipped": 0, "expired": 0, "heap_size": 0,
+            "leader": False,
+        }
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leader:
+            # Hand over now instead of when the lease runs out
+            await self.db.scheduler_leases.delete_one({"_id": LEASE_ID, "owner": self.owner})
+            self.leader = self.stats["leader"] = False
+
+    async def _acquire_lease(self, now: datetime) -> bool:
+        try:
+            await self.db.scheduler_leases.update_one(
+                {"_id": LEASE_ID, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + self.lease}},
+                upsert=True,
+            )
+            leader = True
+        except DuplicateKeyError:
+            # Held by another live instance
+            leader = False
+        if leader and not self.leader:
+            # State may have moved on under the previous holder; start over
+            self._heap = []
+            self._loaded_until = None
+        self.leader = self.stats["leader"] = leader
+        return leader
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._acquire_lease(datetime.utcnow()):
+                    await self.tick()
+            except Exception:
+                logger.exception("Reminder scheduler tick failed")
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _schedule(self, reminder: Dict[str, Any], now: datetime) -> datetime:
+        prediction = None
+        if reminder["type"] in CYCLE_REMINDER_TYPES:
+            user = await self.db.users.find_one({"_id": reminder["user_id"]}, {"password_hash": 0})
+            if user:
+                prediction = await get_user_prediction(self.db, user)
+        return next_fire_at(reminder, prediction, now)
+
+    def _push(self, fire_at: datetime, reminder_id) -> None:
+        if self._loaded_until is not None and fire_at < self._loaded_until:
+            heapq.heappush(self._heap, (fire_at, reminder_id))
+
+    async def _schedule_pending(self, now: datetime) -> None:
+        cursor = self.db.reminders.find(
+            {"enabled": True, "next_fire_at": None}
+        ).limit(self.batch_size)
+        async for reminder in cursor:
+            fire_at = await self._schedule(reminder, now)
+            result = await self.db.reminders.update_one(
+                {"_id": reminder["_id"], "next_fire_at": None},
+                {"$set": {"next_fire_at": fire_at}},
+            )
+            if result.modified_count:
+                self.stats["scheduled"] += 1
+                self._push(fire_at, reminder["_id"])
+
+    async def _advance(self, reminder: Dict[str, Any], fire_at: datetime, now: datetime):
+        """Move a reminder past `fire_at`; the new instant, or None if another instance did."""
+        following = await self._schedule(reminder, max(now, fire_at))
+        claimed = await self.db.reminders.update_one(
+            {"_id": reminder["_id"], "next_fire_at": fire_at},
+            {"$set": {"next_fire_at": following, "last_fired_at": fire_at}},
+        )
+        return following if claimed.modified_count else None
+
+    async def _expire_stale(self, now: datetime) -> None:
+        """Advance occurrences older than the grace period without delivering them."""
+        cursor = self.db.reminders.find(
+            {"enabled": True, "next_fire_at": {"$lt": now - self.grace}}
+        ).limit(self.batch_size)
+        async for reminder in cursor:
+            following = await self._advance(reminder, reminder["next_fire_at"], now)
+            if following is not None:
+                self.stats["expired"] += 1
+                self._push(following, reminder["_id"])
+
+    async def _load_window(self, now: datetime) -> None:
+        if self._loaded_until is not None and now + self.horizon / 2 < self._loaded_until:
+            return
+        start = self._loaded_until or now - self.grace
+        end = now + self.horizon
+        cursor = self.db.reminders.find(
+            {"enabled": True, "next_fire_at": {"$gte": start, "$lt": end}},
+            {"next_fire_at": 1},
+        )
+        async for reminder in cursor:
+            heapq.heappush(self._heap, (reminder["next_fire_at"], reminder["_id"]))
+        self._loaded_until = end
+
+    async def tick(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        await self._schedule_pending(now)
+        await self._expire_stale(now)
+        await self._load_window(now)
+
+        delivered = 0
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, reminder_id = heapq.heappop(self._heap)
+            reminder = await self.db.reminders.find_one(
+                {"_id": reminder_id, "enabled": True, "next_fire_at": fire_at}
+            )
+            if reminder is None:
+                # Deleted, disabled, or rescheduled since it was queued
+                self.stats["skipped"] += 1
+                continue
+            following = await self._advance(reminder, fire_at, now)
+            if following is None:
+                self.stats["skipped"] += 1
+                continue
+            if fire_at < now - self.grace:
+                self.stats["expired"] += 1
+                self._push(following, reminder_id)
+                continue
+            await self.sink.deliver(reminder, fire_at)
+            delivered += 1
+            self._push(following, reminder_id)
+
+        self.stats["delivered"] += delivered
+        self.stats["heap_size"] = len(self._heap)
+        return delivered
+
+
+scheduler: Optional[ReminderScheduler] = None
+
+
+async def start_scheduler(db) -> None:
+    global scheduler
+    scheduler = ReminderScheduler(
+        db,
+        LogSink(),
+        tick_seconds=settings.reminder_tick_seconds,
+        horizon_seconds=settings.reminder_horizon_seconds,
+        grace_seconds=settings.reminder_grace_seconds,
+    )
+    await scheduler.start()
+
+
+async def stop_scheduler() -> None:
+    global scheduler
+    if scheduler:
+        await scheduler.stop()
+        scheduler = None
@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+import os
+import uuid
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from mongomock_motor import AsyncMongoMockClient
+import database
+from services import prediction_cache
+from services.cache_service import user_cache
+
+
+class YieldingCollection:
+    """Collection proxy that yields to the event loop before every awaited call.
+
+    mongomock's async methods complete without suspending, so concurrent
+    handlers would never interleave; this makes every round trip a switch
+    point, like a real server.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return await attr(*args, **kwargs)
+
+        return call
+
+
+class YieldingDatabase:
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        return YieldingCollection(self._db[name])
+
+    def __getitem__(self, name):
+        return YieldingCollection(self._db[name])
+
+
+@pytest.fixture
+async def db(monkeypatch):
+    """A fresh in-memory database installed as database.db, with empty caches."""
+    mock = YieldingDatabase(AsyncMongoMockClient()["mycare_test"])
+    monkeypatch.setattr(database, "db", mock)
+    for cache in (user_cache, prediction_cache.prediction_cache):
+        cache.clear()
+    return mock
+
+
+@pytest.fixture
+async def mongo_db():
+    """A throwaway database on the real server at MONGODB_TEST_URI.
+
+    For code mongomock cannot execute (aggregation operators, change
+    streams). Start one with `docker compose up -d mongodb` and
+    MONGODB_TEST_URI=mongodb://localhost:27017.
+    """
+    uri = os.environ.get("MONGODB_TEST_URI")
+    if not uri:
+        pytest.skip("MONGODB_TEST_URI is not set")
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    name = f"mycare_test_{uuid.uuid4().hex[:12]}"
+    try:
+        yield client[name]
+    finally:
+        await client.drop_database(name)
+        client.close()
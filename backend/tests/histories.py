@@ -0,0 +1,33 @@
+"""Hypothesis strategies for cycle histories around the validity boundaries."""
+from datetime import date, timedelta
+from hypothesis import strategies as st
+
+# Day offsets around the 15..60 gap and 1..14 duration validity bounds
+GAP_CHOICES = (0, 1, 3, 14, 15, 16, 21, 26, 28, 29, 31, 35, 59, 60, 61, 90)
+DURATION_CHOICES = (-2, -1, 0, 1, 2, 5, 7, 13, 14, 15, 20)
+BAD_STARTS = ("2024-13-01", "garbage", "2024-02-30")
+
+_end = st.one_of(
+    st.sampled_from(DURATION_CHOICES),
+    st.sampled_from([None, "", "not-a-date"]),
+)
+
+
+@st.composite
+def histories(draw, user_id="u", max_size=40, bad_starts=True):
+    """Cycles walking back from around today, in arbitrary order.
+
+    Includes duplicate starts, missing and malformed end dates, and (with
+    bad_starts) start dates that do not parse.
+    """
+    day = date.today() - timedelta(days=draw(st.integers(0, 400)))
+    cycles = []
+    for gap, end in draw(st.lists(st.tuples(st.sampled_from(GAP_CHOICES), _end), max_size=max_size)):
+        day -= timedelta(days=gap)
+        if isinstance(end, int):
+            end = (day + timedelta(days=end)).isoformat()
+        cycles.append({"user_id": user_id, "start_date": day.isoformat(), "end_date": end})
+    if bad_starts and cycles and draw(st.booleans()):
+        index = draw(st.integers(0, len(cycles) - 1))
+        cycles[index]["start_date"] = draw(st.sampled_from(BAD_STARTS))
+    return draw(st.permutations(cycles))
@@ -0,0 +1,15 @@
+import asyncio
+from config import settings
+from services.auth_service import hash_password_async, verify_password_async
+
+
+def test_hash_pool_serves_more_than_one_event_loop(monkeypatch):
+    # One slot, so every batch waits on the semaphore
+    monkeypatch.setattr(settings, "password_hash_concurrency", 1)
+
+    async def batch():
+        hashes = await asyncio.gather(*(hash_password_async("secret1") for _ in range(3)))
+        return await verify_password_async("secret1", hashes[0])
+
+    assert asyncio.run(batch())
+    assert asyncio.run(batch())
@@ -0,0 +1,48 @@
+import httpx
+import pytest
+from config import settings
+from main import app
+
+
+@pytest.fixture
+async def client(db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _register(client):
+    response = await client.post(
+        "/auth/register", json={"name": "Ann", "email": "ann@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize("claims", [True, False])
+async def test_revoked_access_token_rejected_on_write_routes(client, monkeypatch, claims):
+    monkeypatch.setattr(settings, "claims_tokens_enabled", claims)
+    token = (await _register(client))["access_token"]
+    cycle = {"start_date": "2024-01-01"}
+    assert (await client.post("/cycles", json=cycle, headers=_auth(token))).status_code == 201
+
+    assert (await client.post("/auth/revoke", headers=_auth(token))).status_code == 204
+
+    assert (await client.post("/cycles", json=cycle, headers=_auth(token))).status_code == 401
+    assert (await client.get("/reminders", headers=_auth(token))).status_code == 401
+
+
+async def test_refresh_token_is_single_use(client, monkeypatch):
+    monkeypatch.setattr(settings, "claims_tokens_enabled", True)
+    first = (await _register(client))["refresh_token"]
+
+    response = await client.post("/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+
+    # Replaying a spent token fails and ends every session of the user
+    assert (await client.post("/auth/refresh", json={"refresh_token": first})).status_code == 401
+    assert (await client.post("/auth/refresh", json={"refresh_token": second})).status_code == 401
@@ -0,0 +1,31 @@
+import httpx
+import pytest
+from main import app
+
+
+@pytest.fixture
+async def client(db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _register(client):
+    response = await client.post(
+        "/auth/register", json={"name": "Ann", "email": "ann@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def test_unpadded_range_does_not_reach_later_symptoms(client):
+    headers = await _register(client)
+    for date in ("2024-10-05", "2024-10-20"):
+        assert (await client.post("/symptoms", json={"date": date}, headers=headers)).status_code == 201
+
+    # As strings, "2024-10-20" <= "2024-10-9"
+    response = await client.get("/calendar?from=2024-10-01&to=2024-10-9", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["to"] == "2024-10-09"
+    assert len(body["days"]) == 9
+    assert [s["date"] for s in body["symptoms"]] == ["2024-10-05"]
@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from services.cache_service import user_cache
+from services.change_watcher import ChangeWatcher
+
+pytestmark = pytest.mark.mongodb
+
+
+async def _until(predicate, timeout=10):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+async def test_user_write_evicts_cached_user(mongo_db):
+    """Needs MONGODB_TEST_URI to point at a replica set (change streams)."""
+    user_id = (await mongo_db.users.insert_one({"email": "watch@example.com"})).inserted_id
+    watcher = ChangeWatcher(mongo_db)
+    await watcher.start()
+    try:
+        if not await _until(lambda: watcher.stats["running"] or watcher._task.done()) or watcher._task.done():
+            pytest.skip("change streams unavailable (standalone server)")
+
+        await user_cache.set(str(user_id), {"_id": user_id})
+        await user_cache.set(str(ObjectId()), {"email": "someone else"})
+        await mongo_db.users.update_one({"_id": user_id}, {"$inc": {"cycles_version": 1}})
+
+        assert await _until(lambda: watcher.stats["invalidations"] >= 1)
+        assert await user_cache.get(str(user_id)) is None
+    finally:
+        await watcher.stop()
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime
+from fastapi import HTTPException
+from routers.cycles import delete_cycle, log_cycle, update_cycle
+from models.cycle import CycleCreate, CycleUpdate
+from services.cycle_stats_service import (
+    EMPTY_CYCLE_STATS, LOCK_FIELD, cycle_stats_lock, rebuild_cycle_stats,
+)
+from services.index_service import ensure_indexes
+
+
+async def _user(db):
+    result = await db.users.insert_one(
+        {"email": "stats@example.com", "cycle_stats": dict(EMPTY_CYCLE_STATS), "created_at": datetime.utcnow()}
+    )
+    return {"_id": result.inserted_id}
+
+
+async def _stored_and_rebuilt(db, user_id):
+    stored = (await db.users.find_one({"_id": user_id}))["cycle_stats"]
+    return stored, await rebuild_cycle_stats(db, user_id)
+
+
+async def test_concurrent_inserts_between_neighbours(db):
+    user = await _user(db)
+    for start in ("2024-01-01", "2024-03-01"):
+        await log_cycle(CycleCreate(start_date=start, end_date=start), current_user=user)
+
+    # Both land between the same two cycles; unserialized, each counts the
+    # other as a neighbour and the 2024-01-20 -> 2024-02-10 gap twice.
+    await asyncio.gather(
+        log_cycle(CycleCreate(start_date="2024-01-20"), current_user=user),
+        log_cycle(CycleCreate(start_date="2024-02-10"), current_user=user),
+    )
+
+    stored, rebuilt = await _stored_and_rebuilt(db, user["_id"])
+    assert stored == rebuilt
+    assert stored["gap_count"] == 3
+
+
+async def test_concurrent_insert_and_delete(db):
+    user = await _user(db)
+    ids = []
+    for start in ("2024-01-01", "2024-01-25", "2024-02-20", "2024-03-15"):
+        ids.append((await log_cycle(CycleCreate(start_date=start), current_user=user)).id)
+
+    await asyncio.gather(
+        delete_cycle(ids[1], current_user=user),
+        log_cycle(CycleCreate(start_date="2024-02-05"), current_user=user),
+    )
+
+    stored, rebuilt = await _stored_and_rebuilt(db, user["_id"])
+    assert stored == rebuilt
+    assert LOCK_FIELD not in await db.users.find_one({"_id": user["_id"]})
+
+
+class _SlowUserWrites:
+    """db proxy whose users.update_one takes a few extra round trips."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getattr__(self, name):
+        collection = getattr(self._db, name)
+        if name != "users":
+            return collection
+
+        class Users:
+            def __getattr__(self, attr):
+                return getattr(collection, attr)
+
+            async def update_one(self, *args, **kwargs):
+                for _ in range(5):
+                    await asyncio.sleep(0)
+                return await collection.update_one(*args, **kwargs)
+
+        return Users()
+
+
+async def test_update_during_locked_rebuild(db):
+    user = await _user(db)
+    cycle = await log_cycle(CycleCreate(start_date="2024-01-01", end_date="2024-01-04"), current_user=user)
+
+    async def rebuild():
+        # As an import or the rebuild script does; the stats write lands
+        # well after the cycles were read
+        async with cycle_stats_lock(db, user["_id"]):
+            await rebuild_cycle_stats(_SlowUserWrites(db), user["_id"])
+
+    await asyncio.gather(
+        rebuild(),
+        update_cycle(cycle.id, CycleUpdate(end_date="2024-01-07"), current_user=user),
+    )
+
+    stored, rebuilt = await _stored_and_rebuilt(db, user["_id"])
+    assert stored == rebuilt
+
+
+async def test_duplicate_start_date_is_rejected(db):
+    await ensure_indexes(db)
+    user = await _user(db)
+
+    results = await asyncio.gather(
+        log_cycle(CycleCreate(start_date="2024-01-01"), current_user=user),
+        log_cycle(CycleCreate(start_date="2024-01-01"), current_user=user),
+        return_exceptions=True,
+    )
+
+    conflicts = [r for r in results if isinstance(r, HTTPException)]
+    assert len(conflicts) == 1 and conflicts[0].status_code == 409
+    assert await db.cycles.count_documents({"user_id": user["_id"]}) == 1
+    stored, rebuilt = await _stored_and_rebuilt(db, user["_id"])
+    assert stored == rebuilt
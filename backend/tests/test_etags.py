@@ -0,0 +1,38 @@
+import httpx
+import pytest
+from main import app
+from services.cache_service import user_cache
+
+
+@pytest.fixture
+async def client(db):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _register(client):
+    response = await client.post(
+        "/auth/register", json={"name": "Ann", "email": "ann@example.com", "password": "secret1"}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.parametrize("path", ["/cycles", "/predictions", "/dashboard"])
+async def test_write_in_another_worker_changes_etag(client, path):
+    body = await _register(client)
+    headers = {"Authorization": f"Bearer {body['access_token']}"}
+    first = await client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    stale = await user_cache.get(body["user"]["id"])
+
+    assert (await client.post("/cycles", json={"start_date": "2024-01-01"}, headers=headers)).status_code == 201
+    # Another worker took the write: this worker still caches the old document
+    await user_cache.set(body["user"]["id"], stale)
+
+    response = await client.get(path, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = await client.get(path, headers={**headers, "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
@@ -0,0 +1,20 @@
+import pytest
+from models.cycle import CycleCreate
+from services.import_service import validate_record
+
+DATE_FIELDS = ("start_date", "end_date")
+
+
+@pytest.mark.parametrize("value", ["2024-1-5", "2024-01-5", "2024-02-30", "05/01/2024"])
+def test_non_canonical_dates_are_rejected(value):
+    entry, problem = validate_record(CycleCreate, DATE_FIELDS, {"start_date": value})
+    assert entry is None
+    assert problem == "start_date: expected a YYYY-MM-DD date"
+
+
+def test_padded_dates_are_accepted():
+    entry, problem = validate_record(
+        CycleCreate, DATE_FIELDS, {"start_date": "2024-01-05", "end_date": "2024-01-09"}
+    )
+    assert problem is None
+    assert entry.start_date == "2024-01-05"
@@ -0,0 +1,73 @@
+import pytest
+from bson import ObjectId
+from services.insights_service import MIN_SERVER_VERSION, get_user_insights, insights_cache
+
+pytestmark = pytest.mark.mongodb
+
+NO_RATES = {"breast_tenderness": 0, "acne": 0, "nausea": 0}
+
+
+def _severity(**values):
+    return {field: values.get(field, 0) for field in ("cramps", "bloating", "headache", "backache")}
+
+
+async def test_insights_pipeline_groups_by_phase_and_cycle_day(mongo_db):
+    info = await mongo_db.client.server_info()
+    assert tuple(info["versionArray"][:2]) >= MIN_SERVER_VERSION
+
+    user_id, other_id = ObjectId(), ObjectId()
+    await mongo_db.cycles.insert_many([
+        {"user_id": user_id, "start_date": "2024-01-01"},
+        {"user_id": user_id, "start_date": "2024-01-29"},
+        {"user_id": other_id, "start_date": "2023-12-25"},
+    ])
+    await mongo_db.symptoms.insert_many([
+        # Before the first cycle: no cycle to attach, dropped
+        {"user_id": user_id, "date": "2023-12-31", "cramps": 5},
+        # Unparsable date: cycle_day is null, dropped
+        {"user_id": user_id, "date": "not-a-date", "cramps": 5},
+        {"user_id": user_id, "date": "2024-01-02", "cramps": 3, "acne": True, "mood": "sad"},
+        {"user_id": user_id, "date": "2024-01-03", "cramps": 1, "mood": "sad"},
+        {"user_id": user_id, "date": "2024-01-12", "headache": 2, "energy": "high"},
+        {"user_id": user_id, "date": "2024-01-27", "backache": 1},
+        {"user_id": user_id, "date": "2024-01-30", "cramps": 2, "bloating": 4, "acne": False, "mood": "calm"},
+        {"user_id": other_id, "date": "2024-01-02", "cramps": 4, "mood": "sad"},
+    ])
+    insights_cache.clear()
+
+    # No cycle_stats: averages 28/5, so days 1-5 menstruation, 6-9
+    # follicular, 10-15 ovulation, 16-27 luteal, later late_luteal.
+    summary = await get_user_insights(mongo_db, {"_id": user_id})
+
+    assert summary["total_logs"] == 5
+    assert summary["average_cycle_length"] == 28
+    assert summary["average_period_length"] == 5
+    assert summary["phases"] == {
+        "menstruation": {
+            "logs": 3,
+            "severity": _severity(cramps=2.0, bloating=4.0),
+            "rates": {**NO_RATES, "acne": 0.33},
+            "mood": {"sad": 2, "calm": 1},
+            "energy": {},
+        },
+        "ovulation": {
+            "logs": 1,
+            "severity": _severity(headache=2.0),
+            "rates": NO_RATES,
+            "mood": {},
+            "energy": {"high": 1},
+        },
+        "luteal": {
+            "logs": 1,
+            "severity": _severity(backache=1.0),
+            "rates": NO_RATES,
+            "mood": {},
+            "energy": {},
+        },
+    }
+    assert summary["cycle_days"] == [
+        {"day": 2, "logs": 2, "severity": _severity(cramps=2.5, bloating=4.0), "rates": {**NO_RATES, "acne": 0.5}},
+        {"day": 3, "logs": 1, "severity": _severity(cramps=1.0), "rates": NO_RATES},
+        {"day": 12, "logs": 1, "severity": _severity(headache=2.0), "rates": NO_RATES},
+        {"day": 27, "logs": 1, "severity": _severity(backache=1.0), "rates": NO_RATES},
+    ]
@@ -0,0 +1,41 @@
+"""Prediction microbenchmarks; opt in with `pytest -m benchmark` (pytest-benchmark)."""
+import random
+import pytest
+from services import prediction_service as current
+from services.prediction_batch import cycles_to_columns, predict_batch
+from tests import prediction_reference as reference
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module", params=[10, 100, 1000, 10000])
+def history(request):
+    """request.param plausible cycles, shuffled."""
+    rng = random.Random(request.param)
+    day = 738000  # 2021-07-29
+    cycles = []
+    for _ in range(request.param):
+        day -= rng.choice((21, 26, 28, 29, 31, 35))
+        cycles.append({
+            "user_id": "u",
+            "start_date": current.format_ordinal(day),
+            "end_date": current.format_ordinal(day + rng.randint(2, 7)),
+        })
+    rng.shuffle(cycles)
+    return cycles
+
+
+def test_reference(benchmark, history):
+    benchmark(reference.predict_next_period, history)
+
+
+def test_scalar(benchmark, history):
+    benchmark(current.predict_next_period, history)
+
+
+def test_batch_100_users(benchmark, history):
+    # The same history spread over 100 users; divide by 100 for per-user cost
+    columns = cycles_to_columns([dict(c, user_id=f"u{i}") for i in range(100) for c in history])
+    benchmark(predict_batch, *columns)
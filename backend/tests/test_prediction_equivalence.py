@@ -0,0 +1,62 @@
+from hypothesis import given, settings, strategies as st
+from services import prediction_service as current
+from services.cycle_stats_service import EMPTY_CYCLE_STATS, _Delta, valid_duration, valid_gap
+from services.prediction_batch import cycles_to_columns, predict_batch
+from tests import prediction_reference as reference
+from tests.histories import histories
+
+
+def _outcome(fn, *args):
+    try:
+        return fn(*args)
+    except ValueError:
+        return ValueError
+
+
+def _stats_from_sums(cycles):
+    """cycle_stats as rebuild_cycle_stats would store them, without a database."""
+    stats = dict(EMPTY_CYCLE_STATS)
+    delta = _Delta()
+    prev = None
+    for cycle in sorted(cycles, key=lambda c: c["start_date"]):
+        delta.add("gap", valid_gap(prev, cycle), 1)
+        delta.add("duration", valid_duration(cycle), 1)
+        prev = cycle
+    for key, value in delta.inc.items():
+        stats[key.split(".", 1)[1]] = value
+    return stats
+
+
+@settings(max_examples=500)
+@given(histories(max_size=150))
+def test_scalar_matches_reference(cycles):
+    for name in ("calculate_cycle_stats", "predict_next_period"):
+        assert _outcome(getattr(current, name), cycles) == _outcome(getattr(reference, name), cycles)
+
+
+@settings(max_examples=300)
+@given(histories(bad_starts=False).filter(bool))
+def test_cycle_stats_sums_match_reference(cycles):
+    expected = reference.calculate_cycle_stats(cycles)
+    assert current.averages_from_cycle_stats(_stats_from_sums(cycles)) == (
+        expected["average_cycle_length"], expected["average_period_length"]
+    )
+
+
+@st.composite
+def populations(draw):
+    users = {}
+    for i in range(draw(st.integers(1, 12))):
+        users[f"u{i:03d}"] = draw(histories(user_id=f"u{i:03d}", max_size=12).filter(bool))
+    rows = draw(st.permutations([c for cycles in users.values() for c in cycles]))
+    return users, rows
+
+
+@settings(max_examples=200)
+@given(populations())
+def test_batch_matches_reference_per_user(population):
+    users, rows = population
+    batch = dict(predict_batch(*cycles_to_columns(rows)).iter_dicts())
+    for user_id, cycles in users.items():
+        # Absent from the batch exactly where the scalar function raises
+        assert batch.get(user_id, ValueError) == _outcome(reference.predict_next_period, cycles)
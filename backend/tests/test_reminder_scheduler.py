@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from bson import ObjectId
+from services.reminder_scheduler import QueueSink, ReminderScheduler
+
+
+def _scheduler(db, sink=None):
+    return ReminderScheduler(db, sink or QueueSink(), tick_seconds=30, horizon_seconds=900, grace_seconds=300)
+
+
+async def _daily(db, next_fire_at):
+    result = await db.reminders.insert_one({
+        "user_id": ObjectId(), "type": "daily_log", "time": "08:00",
+        "enabled": True, "next_fire_at": next_fire_at,
+    })
+    return result.inserted_id
+
+
+async def test_overdue_beyond_grace_is_advanced_not_delivered(db):
+    now = datetime(2024, 5, 10, 12, 0)
+    stale = await _daily(db, datetime(2024, 5, 7, 8, 0))
+    recent = await _daily(db, now - timedelta(minutes=2))
+    sink = QueueSink()
+    scheduler = _scheduler(db, sink)
+
+    assert await scheduler.tick(now) == 1
+
+    fire_at, reminder = sink.queue.get_nowait()
+    assert reminder["_id"] == recent
+    assert scheduler.stats["expired"] == 1
+    advanced = await db.reminders.find_one({"_id": stale})
+    assert advanced["next_fire_at"] == datetime(2024, 5, 11, 8, 0)
+
+
+async def test_one_lease_holder_at_a_time(db):
+    now = datetime.utcnow()
+    first, second = _scheduler(db), _scheduler(db)
+
+    assert await first._acquire_lease(now)
+    assert not await second._acquire_lease(now)
+    assert await first._acquire_lease(now + timedelta(seconds=30))
+
+    # An expired lease is taken over
+    assert await second._acquire_lease(now + timedelta(seconds=200))
+    assert not await first._acquire_lease(now + timedelta(seconds=200))
+
+    # A stopping holder hands over immediately
+    await second.stop()
+    assert await first._acquire_lease(datetime.utcnow())
@@ -18,12 +18,44 @@ api.interceptors.request.use(
     }
 );
 
+// Single in-flight refresh shared by every request that hit a 401
+let refreshing = null;
+
+const refreshAccessToken = () => {
+    if (!refreshing) {
+        const refreshToken = localStorage.getItem('mycare_refresh_token');
+        refreshing = axios.post('/api/auth/refresh', { refresh_token: refreshToken })
+            .then((response) => {
+                localStorage.setItem('mycare_token', response.data.access_token);
+                localStorage.setItem('mycare_refresh_token', response.data.refresh_token);
+                return response.data.access_token;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
 // Add a response interceptor to handle unauthorized errors
 api.interceptors.response.use(
     (response) => response,
-    (error) => {
+    async (error) => {
+        const original = error.config;
         if (error.response && error.response.status === 401) {
+            // Short-lived access tokens are renewed once with the refresh token
+            if (localStorage.getItem('mycare_refresh_token') && original && !original._retried) {
+                original._retried = true;
+                try {
+                    const token = await refreshAccessToken();
+                    original.headers.Authorization = `Bearer ${token}`;
+                    return api(original);
+                } catch (refreshError) {
+                    // Fall through and clear the session
+                }
+            }
             localStorage.removeItem('mycare_token');
+            localStorage.removeItem('mycare_refresh_token');
             localStorage.removeItem('mycare_user');
             // We don't redirect here, we let the AuthContext handle the state change
         }
@@ -19,9 +19,14 @@ export const AuthProvider = ({ children }) => {
     const login = async (email, password) => {
         try {
             const response = await api.post('/auth/login', { email, password });
-            const { access_token, user: userData } = response.data;
+            const { access_token, refresh_token, user: userData } = response.data;
 
             localStorage.setItem('mycare_token', access_token);
+            if (refresh_token) {
+                localStorage.setItem('mycare_refresh_token', refresh_token);
+            } else {
+                localStorage.removeItem('mycare_refresh_token');
+            }
             localStorage.setItem('mycare_user', JSON.stringify(userData));
 
             setToken(access_token);
@@ -49,6 +54,7 @@ export const AuthProvider = ({ children }) => {
 
     const logout = () => {
         localStorage.removeItem('mycare_token');
+        localStorage.removeItem('mycare_refresh_token');
         localStorage.removeItem('mycare_user');
         setToken(null);
         setUser(null);
@@ -1,29 +1,27 @@
 import React, { useEffect, useState } from 'react';
 import api from '../api/axios';
-import { format, startOfMonth, endOfMonth, eachDayOfInterval, isSameMonth, isSameDay, addMonths, subMonths, parseISO } from 'date-fns';
+import { format, startOfMonth, endOfMonth, eachDayOfInterval, isSameMonth, isSameDay, addMonths, subMonths } from 'date-fns';
 import { ChevronLeft, ChevronRight, X, Activity, Droplet, Zap, Utensils } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Link } from 'react-router-dom';
 
 const Calendar = () => {
     const [currentMonth, setCurrentMonth] = useState(new Date());
-    const [cycles, setCycles] = useState([]);
-    const [predictions, setPredictions] = useState(null);
-    const [symptoms, setSymptoms] = useState([]);
+    const [calendar, setCalendar] = useState(null);
     const [loading, setLoading] = useState(true);
     const [selectedDay, setSelectedDay] = useState(null);
 
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [cyclesRes, predRes, symptomsRes] = await Promise.all([
-                    api.get('/cycles'),
-                    api.get('/predictions'),
-                    api.get('/symptoms') // Assuming an endpoint that returns all or recent symptoms
-                ]);
-                setCycles(cyclesRes.data);
-                setPredictions(predRes.data);
-                setSymptoms(symptomsRes.data);
+                // One request per visible month: per-day flags plus that month's logs
+                const response = await api.get('/calendar', {
+                    params: {
+                        from: format(startOfMonth(currentMonth), 'yyyy-MM-dd'),
+                        to: format(endOfMonth(currentMonth), 'yyyy-MM-dd'),
+                    }
+                });
+                setCalendar(response.data);
             } catch (error) {
                 console.error('Failed to fetch calendar data', error);
             } finally {
@@ -31,48 +29,35 @@ const Calendar = () => {
             }
         };
         fetchData();
-    }, []);
+    }, [currentMonth]);
 
     const days = eachDayOfInterval({
         start: startOfMonth(currentMonth),
         end: endOfMonth(currentMonth),
     });
 
-    const getDayStatus = (day) => {
-        const dateStr = format(day, 'yyyy-MM-dd');
-
-        // Logged Period
-        const isLogged = cycles.some(c => {
-            const start = c.start_date;
-            const end = c.end_date || start;
-            return dateStr >= start && dateStr <= end;
-        });
-        if (isLogged) return 'logged-period';
-
-        // Predicted Period
-        const isPredicted = predictions?.future_predictions?.some(p => {
-            return dateStr >= p.start_date && dateStr <= p.end_date;
-        }) || (dateStr >= predictions?.next_period_date && dateStr <= format(addMonths(parseISO(predictions?.next_period_date), 0), 'yyyy-MM-dd')); // Basic fallthrough for next period
-
-        if (isPredicted) return 'predicted-period';
-
-        // Ovulation
-        const isOvulation = predictions?.future_predictions?.some(p => dateStr === p.ovulation_date) ||
-            dateStr === predictions?.ovulation_date;
-        if (isOvulation) return 'ovulation';
+    const getDayFlags = (day) => {
+        if (!calendar || format(day, 'yyyy-MM') !== calendar.from.slice(0, 7)) return 0;
+        return calendar.days[day.getDate() - 1] || 0;
+    };
 
+    const getDayStatus = (day) => {
+        const flags = getDayFlags(day);
+        if (!calendar) return 'normal';
+        if (flags & calendar.flags.logged_period) return 'logged-period';
+        if (flags & calendar.flags.predicted_period) return 'predicted-period';
+        if (flags & calendar.flags.ovulation) return 'ovulation';
         return 'normal';
     };
 
     const hasSymptoms = (day) => {
-        const dateStr = format(day, 'yyyy-MM-dd');
-        return symptoms.some(s => s.date === dateStr);
+        return calendar ? Boolean(getDayFlags(day) & calendar.flags.has_symptoms) : false;
     };
 
     const getDayLogs = (day) => {
         const dateStr = format(day, 'yyyy-MM-dd');
-        const daySymptoms = symptoms.find(s => s.date === dateStr);
-        const dayCycle = cycles.find(c => dateStr >= c.start_date && dateStr <= (c.end_date || c.start_date));
+        const daySymptoms = calendar?.symptoms.find(s => s.date === dateStr);
+        const dayCycle = calendar?.cycles.find(c => dateStr >= c.start_date && dateStr <= (c.end_date || c.start_date));
         return { symptoms: daySymptoms, cycle: dayCycle };
     };
 
@@ -22,11 +22,11 @@ const LogCycle = () => {
         const fetchContext = async () => {
             try {
                 const [cyclesRes, dashboardRes] = await Promise.all([
-                    api.get('/cycles'),
+                    api.get('/cycles', { params: { limit: 3 } }),
                     api.get('/dashboard')
                 ]);
-                const sortedHistory = [...cyclesRes.data].sort((a, b) => new Date(b.start_date) - new Date(a.start_date)).slice(0, 3);
-                setHistory(sortedHistory);
+                // /cycles is already newest-first
+                setHistory(cyclesRes.data);
                 setStats(dashboardRes.data.prediction);
             } catch (error) {
                 console.error('Failed to fetch logging context', error);